@@ -33,6 +33,15 @@ if config.config_file_name is not None:
 # Step 4:
 target_metadata = Base.metadata
 
+# Postgres-only columns that are managed by migrations and not declared on the models.
+UNMANAGED_COLUMNS = {("tasks", "search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "column" and (object.table.name, name) in UNMANAGED_COLUMNS:
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -57,6 +66,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -78,7 +88,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
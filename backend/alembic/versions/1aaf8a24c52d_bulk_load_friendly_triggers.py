@@ -0,0 +1,124 @@
+"""bulk load friendly triggers
+
+Revision ID: 1aaf8a24c52d
+Revises: 7cf551587df6
+Create Date: 2026-10-18 18:47:52.301547
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1aaf8a24c52d'
+down_revision: Union[str, Sequence[str], None] = '7cf551587df6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both row-level triggers updated one hot row per inserted task. Inside a
+    # single bulk-load transaction every such update has to walk all the row
+    # versions the transaction already left behind, so a load got quadratically
+    # slower with its size.
+
+    # A bulk load reserves a block of change versions with one counter update
+    # (holding the same row lock until commit) and inserts them itself.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_bump_change_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' AND NEW.change_version > 0 THEN
+                RETURN NEW;
+            END IF;
+            UPDATE task_change_counter SET version = version + 1 WHERE id = 1
+            RETURNING version INTO NEW.change_version;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Status counts move to per-statement triggers that apply one net change per status.
+    op.execute("DROP TRIGGER tasks_status_counts ON tasks")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_maintain_status_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE task_status_counts c SET count = c.count + d.n
+                FROM (SELECT status, count(*) AS n FROM new_rows WHERE deleted_at IS NULL GROUP BY status) d
+                WHERE c.status = d.status;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE task_status_counts c SET count = c.count - d.n
+                FROM (SELECT status, count(*) AS n FROM old_rows WHERE deleted_at IS NULL GROUP BY status) d
+                WHERE c.status = d.status;
+            ELSE
+                UPDATE task_status_counts c SET count = c.count + d.n
+                FROM (
+                    SELECT status, sum(n) AS n FROM (
+                        SELECT status, 1 AS n FROM new_rows WHERE deleted_at IS NULL
+                        UNION ALL
+                        SELECT status, -1 AS n FROM old_rows WHERE deleted_at IS NULL
+                    ) changes GROUP BY status
+                ) d
+                WHERE c.status = d.status AND d.n <> 0;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_status_counts()
+    """)
+    # Transition tables rule out an UPDATE OF column list; updates that leave
+    # status and deleted_at alone net to zero and write nothing.
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_status_counts()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_status_counts()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_status_counts_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_status_counts_update ON tasks")
+    op.execute("DROP TRIGGER tasks_status_counts_insert ON tasks")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_maintain_status_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                IF OLD.deleted_at IS NULL THEN
+                    UPDATE task_status_counts SET count = count - 1 WHERE status = OLD.status;
+                END IF;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                IF NEW.deleted_at IS NULL THEN
+                    UPDATE task_status_counts SET count = count + 1 WHERE status = NEW.status;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts AFTER INSERT OR UPDATE OF status, deleted_at OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_maintain_status_counts()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_bump_change_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE task_change_counter SET version = version + 1 WHERE id = 1
+            RETURNING version INTO NEW.change_version;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
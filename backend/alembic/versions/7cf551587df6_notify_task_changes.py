@@ -0,0 +1,67 @@
+"""notify task changes
+
+Revision ID: 7cf551587df6
+Revises: db7d32e12249
+Create Date: 2026-10-18 16:21:09.114236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7cf551587df6'
+down_revision: Union[str, Sequence[str], None] = 'db7d32e12249'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One NOTIFY per statement, not per row, so batch writes stay cheap. The
+    # payload is "<commit-side epoch> <id>,<id>,..."; NOTIFY is delivered on
+    # commit, and payloads are capped at 8000 bytes, so a statement touching
+    # too many rows sends no ids, which listeners take as "evict everything".
+    op.execute("""
+        CREATE FUNCTION tasks_notify_change() RETURNS trigger AS $$
+        DECLARE
+            ids text;
+        BEGIN
+            SELECT string_agg(id::text, ',') INTO ids FROM changed;
+            IF ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+            IF length(ids) > 7000 THEN
+                ids := '';
+            END IF;
+            PERFORM pg_notify('task_changes', extract(epoch FROM clock_timestamp())::text || ' ' || ids);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Triggers with transition tables can only fire on a single event.
+    op.execute("""
+        CREATE TRIGGER tasks_notify_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_change()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_notify_update AFTER UPDATE ON tasks
+        REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_change()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_notify_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_change()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_notify_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_notify_update ON tasks")
+    op.execute("DROP TRIGGER tasks_notify_insert ON tasks")
+    op.execute("DROP FUNCTION tasks_notify_change()")
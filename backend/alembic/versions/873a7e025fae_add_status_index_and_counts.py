@@ -0,0 +1,69 @@
+"""add status index and counts
+
+Revision ID: 873a7e025fae
+Revises: 80e84537693d
+Create Date: 2026-10-18 10:41:52.803416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '873a7e025fae'
+down_revision: Union[str, Sequence[str], None] = '80e84537693d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep writers out until the counts are seeded and the trigger is in place.
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    op.create_index(
+        'ix_tasks_status_id', 'tasks', ['status', sa.text('id DESC')], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_table('task_status_counts',
+    sa.Column('status', postgresql.ENUM('pending', 'done', name='statusenum', create_type=False), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    op.execute("""
+        INSERT INTO task_status_counts (status, count)
+        SELECT s, (SELECT count(*) FROM tasks WHERE status = s AND deleted_at IS NULL)
+        FROM unnest(enum_range(NULL::statusenum)) AS s
+    """)
+    # Counts of live (not soft-deleted) rows per status, kept up to date on every write.
+    op.execute("""
+        CREATE FUNCTION tasks_maintain_status_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                IF OLD.deleted_at IS NULL THEN
+                    UPDATE task_status_counts SET count = count - 1 WHERE status = OLD.status;
+                END IF;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                IF NEW.deleted_at IS NULL THEN
+                    UPDATE task_status_counts SET count = count + 1 WHERE status = NEW.status;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts AFTER INSERT OR UPDATE OF status, deleted_at OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_maintain_status_counts()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_status_counts ON tasks")
+    op.execute("DROP FUNCTION tasks_maintain_status_counts()")
+    op.drop_table('task_status_counts')
+    op.drop_index('ix_tasks_status_id', table_name='tasks', postgresql_where=sa.text('deleted_at IS NULL'))
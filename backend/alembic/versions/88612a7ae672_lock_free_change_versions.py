@@ -0,0 +1,141 @@
+"""lock free change versions
+
+Revision ID: 88612a7ae672
+Revises: 1aaf8a24c52d
+Create Date: 2026-10-18 21:14:06.512873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88612a7ae672'
+down_revision: Union[str, Sequence[str], None] = '1aaf8a24c52d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No writes while the version source is switched over.
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+
+    # A row's change_version becomes its writing transaction's id (xid8) plus a
+    # fixed offset, instead of the next value of the single counter row, whose
+    # lock every writer had to queue on until commit. Transaction ids need no
+    # lock, and all of one transaction's rows share its id. The offset puts
+    # every new version above every existing one, so clients keep their ?since=.
+    op.execute("""
+        DO $$
+        DECLARE
+            offset_by bigint;
+        BEGIN
+            SELECT greatest(
+                (SELECT version FROM task_change_counter WHERE id = 1),
+                (SELECT coalesce(max(change_version), 0) FROM tasks)
+            ) - pg_current_xact_id()::text::bigint INTO offset_by;
+            offset_by := greatest(offset_by, 0);
+            EXECUTE format(
+                'CREATE FUNCTION task_change_version() RETURNS bigint LANGUAGE sql STABLE '
+                'AS $f$ SELECT pg_current_xact_id()::text::bigint + %s $f$', offset_by
+            );
+            -- Every transaction below the snapshot's xmin has finished, so no
+            -- version under this can still appear: it is the delta-sync horizon.
+            EXECUTE format(
+                'CREATE FUNCTION task_change_horizon() RETURNS bigint LANGUAGE sql STABLE '
+                'AS $f$ SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint + %s $f$', offset_by
+            );
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_bump_change_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_version := task_change_version();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Changes after ``since``, oldest first, in whole transactions: every row of
+    # the last transaction on the page is included even past ``max_rows``, so
+    # the page's last version is a safe ?since= for the next call.
+    op.execute("""
+        CREATE FUNCTION tasks_changed_since(since bigint, max_rows integer) RETURNS SETOF tasks
+        LANGUAGE sql STABLE AS $$
+            WITH horizon AS (
+                SELECT task_change_horizon() AS version
+            ), page AS (
+                SELECT change_version FROM tasks, horizon
+                WHERE change_version > since AND change_version < horizon.version
+                ORDER BY change_version
+                LIMIT max_rows
+            )
+            SELECT tasks.* FROM tasks, horizon
+            WHERE change_version > since AND change_version < horizon.version
+              AND change_version <= (SELECT max(change_version) FROM page)
+            ORDER BY change_version, id
+        $$
+    """)
+
+    # Tombstones are purged after a retention period. The newest version purged
+    # is kept, so a client syncing from before it can be told to start over.
+    op.create_table('task_tombstone_purges',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO task_tombstone_purges (id, version) VALUES (1, 0)")
+    op.create_index(
+        'ix_tasks_deleted_at', 'tasks', ['deleted_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+    op.execute("""
+        CREATE FUNCTION tasks_purge_tombstones(older_than interval) RETURNS bigint AS $$
+        DECLARE
+            purged bigint;
+            newest bigint;
+        BEGIN
+            WITH gone AS (
+                DELETE FROM tasks WHERE deleted_at < now() - older_than RETURNING change_version
+            )
+            SELECT count(*), max(change_version) INTO purged, newest FROM gone;
+            IF purged > 0 THEN
+                UPDATE task_tombstone_purges SET version = greatest(version, newest) WHERE id = 1;
+            END IF;
+            RETURN purged;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("DROP FUNCTION tasks_purge_tombstones(interval)")
+    op.drop_index('ix_tasks_deleted_at', table_name='tasks')
+    op.drop_table('task_tombstone_purges')
+    op.execute("DROP FUNCTION tasks_changed_since(bigint, integer)")
+    # The counter carries on from the highest version handed out.
+    op.execute("""
+        UPDATE task_change_counter
+        SET version = greatest(version, task_change_version(), (SELECT coalesce(max(change_version), 0) FROM tasks))
+        WHERE id = 1
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_bump_change_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' AND NEW.change_version > 0 THEN
+                RETURN NEW;
+            END IF;
+            UPDATE task_change_counter SET version = version + 1 WHERE id = 1
+            RETURNING version INTO NEW.change_version;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP FUNCTION task_change_horizon()")
+    op.execute("DROP FUNCTION task_change_version()")
@@ -0,0 +1,61 @@
+"""add change version and tombstones
+
+Revision ID: c7fe6163acdb
+Revises: 868cfc853c8d
+Create Date: 2026-10-18 09:12:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7fe6163acdb'
+down_revision: Union[str, Sequence[str], None] = '868cfc853c8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_change_counter',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO task_change_counter (id, version) VALUES (1, 0)")
+    op.add_column('tasks', sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Every insert/update takes the next value from the single counter row. The row
+    # lock is held until commit, so versions become visible in commit order and a
+    # client syncing with ?since= can never skip a change that commits late.
+    op.execute("""
+        CREATE FUNCTION tasks_bump_change_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE task_change_counter SET version = version + 1 WHERE id = 1
+            RETURNING version INTO NEW.change_version;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_change_version BEFORE INSERT OR UPDATE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_bump_change_version()
+    """)
+    # Backfill: the trigger hands every existing row its own version.
+    op.execute("UPDATE tasks SET change_version = 0")
+    op.create_index(op.f('ix_tasks_change_version'), 'tasks', ['change_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tasks_change_version'), table_name='tasks')
+    op.execute("DROP TRIGGER tasks_change_version ON tasks")
+    op.execute("DROP FUNCTION tasks_bump_change_version()")
+    op.execute("DELETE FROM tasks WHERE deleted_at IS NOT NULL")
+    op.drop_column('tasks', 'deleted_at')
+    op.drop_column('tasks', 'change_version')
+    op.drop_table('task_change_counter')
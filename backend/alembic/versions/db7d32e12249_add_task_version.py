@@ -0,0 +1,46 @@
+"""add task version
+
+Revision ID: db7d32e12249
+Revises: 873a7e025fae
+Create Date: 2026-10-18 14:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'db7d32e12249'
+down_revision: Union[str, Sequence[str], None] = '873a7e025fae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    # The SQLAlchemy store sets version = version + 1 in the UPDATE itself so the
+    # new value comes back in RETURNING. Writes that don't (the Supabase REST
+    # store, hand-written SQL) still get a bump from this trigger.
+    op.execute("""
+        CREATE FUNCTION tasks_bump_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.version := OLD.version + 1;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_version BEFORE UPDATE OF title, description, status, deleted_at ON tasks
+        FOR EACH ROW WHEN (NEW.version = OLD.version) EXECUTE FUNCTION tasks_bump_version()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_version ON tasks")
+    op.execute("DROP FUNCTION tasks_bump_version()")
+    op.drop_column('tasks', 'version')
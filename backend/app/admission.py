@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+from collections import deque
+
+from app.telemetry import Counter, Gauge, registry
+
+# Per-worker limits on requests being handled at once, by route class. 0 turns
+# a class's limit off. Excess requests wait in a bounded queue for at most the
+# queue timeout and are otherwise turned away straight away with a 503.
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", "0"))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", "0"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "100"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Long-lived streams would hold a slot for as long as the client stays connected.
+EXEMPT_PATHS = frozenset({"/tasks/events"})
+
+admission_queue_depth = registry.register(Gauge(
+    "admission_queue_depth", "Requests waiting for a slot, by route class.", ("route_class",),
+))
+admission_shed = registry.register(Counter(
+    "admission_shed_total", "Requests turned away with 503, by route class and reason.",
+    ("route_class", "reason"),
+))
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    """Lets at most ``limit`` requests in at once and queues a bounded number more.
+
+    A finished request hands its slot straight to the oldest waiter, so a
+    waiter admitted is never overtaken by a newcomer.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "queue_timeout": 0}
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def _reject(self, reason: str):
+        self.shed[reason] += 1
+        admission_shed.inc(self.name, reason)
+        return Overloaded(reason)
+
+    def _queue_changed(self) -> None:
+        admission_queue_depth.set(len(self._waiters), self.name)
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queue_changed()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                self._drop(waiter)
+                raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # handed a slot just as the client went away
+            else:
+                waiter.cancel()
+                self._drop(waiter)
+            raise
+        self.admitted += 1
+
+    def _drop(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._queue_changed()
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter; in_flight stays the same.
+                waiter.set_result(None)
+                self._queue_changed()
+                return
+        self._queue_changed()
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+read_admission = AdmissionLimiter("read", ADMISSION_READ_LIMIT, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_MS / 1000)
+write_admission = AdmissionLimiter("write", ADMISSION_WRITE_LIMIT, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_MS / 1000)
+
+
+class AdmissionMiddleware:
+    """Applies the read or write limiter to /tasks routes, answering 503 when shedding."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/tasks") or path in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+        limiter = read_admission if scope["method"] in READ_METHODS else write_admission
+        if not limiter.enabled:
+            return await self.app(scope, receive, send)
+
+        try:
+            await limiter.acquire()
+        except Overloaded as exc:
+            body = json.dumps({"detail": "Server is busy, try again shortly", "reason": exc.reason}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(ADMISSION_RETRY_AFTER).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
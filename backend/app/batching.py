@@ -0,0 +1,110 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable
+
+# Off by default: batching trades a little latency for far fewer round trips,
+# which only pays off when many inserts arrive together (bulk client syncs).
+TASK_WRITE_BATCHING = os.getenv("TASK_WRITE_BATCHING", "0") == "1"
+TASK_WRITE_WINDOW_MS = float(os.getenv("TASK_WRITE_WINDOW_MS", "2"))
+TASK_WRITE_MAX_BATCH = int(os.getenv("TASK_WRITE_MAX_BATCH", "100"))
+
+
+class WriteBatcher:
+    """Collects concurrent single-row writes and flushes them as one batch.
+
+    When nothing is being written a submission is flushed on the next loop
+    tick, so a lone request only waits for whatever arrived alongside it.
+    While a batch is in flight new submissions collect for at most ``window``
+    seconds, or until ``max_batch`` are waiting, before flushing themselves.
+
+    ``flush_many`` receives every row and must return one result per row, in
+    order. If it raises, each row is retried through ``flush_one`` so one bad
+    row only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        flush_many: Callable[[list], Awaitable[list]],
+        flush_one: Callable[[Any], Awaitable[Any]],
+        window: float,
+        max_batch: int,
+    ):
+        self.flush_many = flush_many
+        self.flush_one = flush_one
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self.fallbacks = 0
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.Handle | None = None
+        self._in_flight = 0
+        # The loop only holds tasks weakly; these keep in-flight writes alive.
+        self._writes: set[asyncio.Task] = set()
+
+    async def submit(self, row) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            delay = self.window if self._in_flight else 0
+            self._timer = asyncio.get_running_loop().call_later(delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that gave up before the flush don't get written.
+        batch = [(row, future) for row, future in self._pending if not future.done()]
+        self._pending = []
+        if batch:
+            self._in_flight += 1
+            task = asyncio.ensure_future(self._write(batch))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        try:
+            self.batches += 1
+            self.rows += len(batch)
+            try:
+                results = await self.flush_many([row for row, _ in batch])
+            except Exception:
+                self.fallbacks += 1
+                await asyncio.gather(*(self._write_one(row, future) for row, future in batch))
+                return
+            if len(results) != len(batch):
+                # The rows may be written, so no per-row retry; just don't leave callers waiting.
+                error = RuntimeError(f"flush_many returned {len(results)} results for {len(batch)} rows")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            if self._pending and self._timer is None and not self._in_flight:
+                self._flush()
+
+    async def _write_one(self, row, future: asyncio.Future) -> None:
+        try:
+            result = await self.flush_one(row)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": TASK_WRITE_BATCHING,
+            "batches": self.batches,
+            "rows": self.rows,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import re
+from typing import Optional
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class PreconditionFailed(Exception):
+    """A conditional write found the task at a different version."""
+
+    def __init__(self, current: dict):
+        super().__init__("Task has been modified")
+        self.current = current
+
+
+def version_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def task_etag(task: dict) -> str:
+    # Full rows carry their version; projections without it fall back to a content hash.
+    if "version" in task:
+        return version_etag(task["version"])
+    return make_etag(json.dumps(task, sort_keys=True, separators=(",", ":")).encode())
+
+
+def variant_etag(etag: str, packed: bool, encoding: Optional[str]) -> str:
+    """``etag`` for one format and content encoding of a body, e.g. ``"2-mp-br"``."""
+    suffix = ("-mp" if packed else "") + (f"-{encoding}" if encoding else "")
+    return etag[:-1] + suffix + '"' if suffix else etag
+
+
+# A version tag, bare or naming a MessagePack and/or compressed variant of it.
+_VERSION_TAG = re.compile(r'"(\d+)(?:-mp)?(?:-(?:gzip|br))?"')
+
+
+def if_match_version(header: str) -> Optional[int]:
+    """The version an If-Match header asks for; None for ``*`` (any version).
+
+    Every variant of a task's representation names the same version, so a tag
+    from a MessagePack or compressed read is as good as the bare one. Weak and
+    unrecognised tags can never match a strong comparison, so they map to
+    version 0, which no row has.
+    """
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return None
+        match = _VERSION_TAG.fullmatch(candidate)
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """Check an If-None-Match (weak comparison) or If-Match (strong) header."""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -1,32 +1,350 @@
-from sqlalchemy.future import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Task
-from app.schemas import TaskCreate, TaskUpdate
-from app.database import supabase
+import asyncio
+from contextlib import aclosing
 
-async def get_tasks():
-    response = supabase.table("tasks").select("*").order("id", desc=True).execute()
-    return response.data
+from app.schemas import TaskCreate, TaskUpdate, TaskBatchUpdate, TaskChanges, TaskSet, TaskStats
+from app.database import get_store
+from app.cache import task_cache
+from app.pagination import MAX_PAGE_SIZE, encode_cursor
+from app.conditional import PreconditionFailed, make_etag
+from app.events import task_events
+from app.invalidation import ChangeListener
+from app.loader import BatchLoader
+from app.singleflight import task_reads
+from app.tombstones import ChangesPurged, TombstonePurger
+from app.telemetry import store_seconds
+from app.batching import TASK_WRITE_BATCHING, TASK_WRITE_MAX_BATCH, TASK_WRITE_WINDOW_MS, WriteBatcher
+from app.serialization import FAST_RESPONSES, Representations, dumps, encode_page
 
-async def get_task(task_id: int):
-    response = supabase.table("tasks").select("*").eq("id", task_id).execute()
-    tasks = response.data
-    return tasks[0] if tasks else None
+EXPORT_CHUNK_SIZE = 1000
+
+
+async def _db(operation: str, call):
+    with store_seconds.time(operation, "db"):
+        return await call
+
+
+def _serializer(operation: str, encode):
+    # JSON is only produced if a client asks for it, so time it where it happens.
+    def to_json(data) -> bytes:
+        with store_seconds.time(operation, "serialize"):
+            return encode(data)
+    return to_json
+
+
+# Concurrent single inserts are folded into one multi-row INSERT when TASK_WRITE_BATCHING is on.
+task_inserts = WriteBatcher(
+    lambda rows: _db("create_tasks", get_store().create_tasks(rows)),
+    lambda row: _db("create_task", get_store().create_task(row)),
+    window=TASK_WRITE_WINDOW_MS / 1000,
+    max_batch=TASK_WRITE_MAX_BATCH,
+)
+
+
+async def _load_by_ids(task_ids: list[int]) -> list:
+    rows = {row["id"]: row for row in await _db("get_tasks_by_ids", get_store().get_tasks_by_ids(task_ids))}
+    return [rows.get(task_id) for task_id in task_ids]
+
+
+# Task lookups that miss the cache in the same loop tick, from any number of
+# requests, are answered by one WHERE id = ANY(...) query.
+task_loader = BatchLoader(_load_by_ids, max_batch=MAX_PAGE_SIZE)
+
+
+def _is_listing(key) -> bool:
+    return key[0] in ("page", "stats")
+
+
+def _stale_reads(ids: set[int]):
+    # In-flight reads that began before a write must not be shared with callers
+    # arriving after it: every listing, search and delta read, plus those rows.
+    task_reads.forget(lambda key: key[0] != "task" or key[1] in ids)
+
+
+def _written(event: str, tasks: list[dict]):
+    _stale_reads({task["id"] for task in tasks})
+    # Any write can move rows in or out of any list page or change the counts.
+    task_cache.invalidate(_is_listing)
+    for task in tasks:
+        task_cache.set(("task", task["id"]), task)
+        task_events.publish(event, task)
+
+
+def _deleted(tasks: list[dict]):
+    ids = {task["id"] for task in tasks}
+    _stale_reads(ids)
+    task_cache.invalidate(lambda key: _is_listing(key) or (key[0] == "task" and key[1] in ids))
+    for task in tasks:
+        task_events.publish("deleted", task)
+
+
+def _changed_elsewhere(ids: set[int] | None):
+    # Another worker wrote these rows (None: unknown rows); nothing cached here
+    # that they could have touched may be served again.
+    if ids is None:
+        task_reads.forget(lambda key: True)
+        task_cache.clear()
+        return
+    _stale_reads(ids)
+    task_cache.invalidate(lambda key: _is_listing(key) or (key[0] == "task" and key[1] in ids))
+
+
+task_changes = ChangeListener(_changed_elsewhere)
+tombstone_purger = TombstonePurger(lambda older_than: _db("purge_tombstones", get_store().purge_tombstones(older_than)))
+
+
+async def get_tasks(limit: int, before_id: int | None = None, status: str | None = None):
+    return await _db("get_tasks", get_store().get_tasks(limit, before_id, status))
+
+async def get_tasks_page(
+    limit: int, before_id: int | None = None, status: str | None = None,
+    fields: tuple[str, ...] | None = None,
+) -> Representations:
+    """One page of the listing, encoded from ready-to-send JSON and cached when possible.
+
+    With ``fields`` only those columns are read and returned.
+    """
+    key = ("page", limit, before_id, status, fields)
+    cached = task_cache.get(key)
+    if cached is not None:
+        return cached
+    return await task_reads.do(key, lambda: _load_page(key, limit, before_id, status, fields))
+
+async def _load_page(key, limit, before_id, status, fields) -> Representations:
+    generation = task_cache.generation
+    # Fetch one extra row so we know whether another page exists.
+    tasks = await _db("get_tasks", get_store().get_tasks(limit + 1, before_id, status, fields))
+    items = tasks[:limit]
+    next_cursor = encode_cursor(items[-1]["id"]) if len(tasks) > limit else None
+    with store_seconds.time("get_tasks", "serialize"):
+        if fields is None:
+            body = encode_page(items, next_cursor)
+        else:
+            # Partial rows don't fit the Task schema; fields were already checked against it.
+            body = dumps({"items": items, "next_cursor": next_cursor})
+    # The cache holds the page itself, so packed and compressed variants are
+    # built once per page rather than once per hit.
+    page = Representations(body, make_etag(body))
+    task_cache.set(key, page, generation)
+    return page
+
+async def get_stats():
+    cached = task_cache.get(("stats",))
+    if cached is not None:
+        return cached
+    return await task_reads.do(("stats",), _load_stats)
+
+async def _load_stats():
+    generation = task_cache.generation
+    counts = await _db("get_status_counts", get_store().get_status_counts())
+    stats = TaskStats(counts=counts, total=sum(counts.values()))
+    task_cache.set(("stats",), stats, generation)
+    return stats
+
+def _encode_changes(changes: dict) -> bytes:
+    if FAST_RESPONSES:
+        return dumps(changes)
+    return TaskChanges(**changes).model_dump_json().encode()
+
+async def get_changes(since: int, limit: int, after: int | None = None) -> Representations:
+    """Rows changed or deleted after change version ``since``, plus the new high-water mark.
+
+    A full sync (``since`` 0) carries on from version ``after``, taken from the
+    previous page's cursor, and is never refused for purged tombstones: a client
+    starting from nothing had none of the rows they stood for.
+    """
+    start = since if after is None else after
+    rows, purged = await task_reads.do(("changes", start, limit), lambda: _load_changes(start, limit))
+    if since > 0 and since < purged:
+        # Deletions this client never saw are gone; only a full resync is correct now.
+        raise ChangesPurged(purged)
+    page, has_more = rows, len(rows) > limit
+    if has_more:
+        # The store returns whole versions, so the page can only end between
+        # them; a version larger than the page is sent whole, and whether
+        # anything follows it is left to the next call.
+        last = rows[limit]["change_version"]
+        page = [row for row in rows if row["change_version"] < last] or [
+            row for row in rows if row["change_version"] == last
+        ]
+    version = page[-1]["change_version"] if page else start
+    changes = {
+        "items": [
+            {k: v for k, v in row.items() if k not in ("change_version", "deleted")}
+            for row in page if not row["deleted"]
+        ],
+        "deleted": [row["id"] for row in page if row["deleted"]],
+        # Once caught up, nothing is left up to the purged versions either, so a
+        # full sync never ends on a version it would be refused for.
+        "version": max(version, purged) if not has_more else version,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(page[-1]["change_version"]) if has_more and since == 0 else None,
+    }
+    return Representations(data=changes, to_json=_serializer("get_changes", _encode_changes))
+
+async def _load_changes(since: int, limit: int) -> tuple[list[dict], int]:
+    rows = await _db("get_changes", get_store().get_changes(since, limit + 1))
+    # Read after the rows: a purge that removed any of the versions asked for shows up here.
+    purged = await _db("get_purged_version", get_store().get_purged_version())
+    return rows, purged
+
+async def search_tasks(query: str, limit: int, offset: int = 0) -> Representations:
+    tasks = await task_reads.do(
+        ("search", query, limit, offset),
+        lambda: _db("search_tasks", get_store().search_tasks(query, limit + 1, offset)),
+    )
+    next_cursor = encode_cursor(offset + limit) if len(tasks) > limit else None
+    page = {"items": tasks[:limit], "next_cursor": next_cursor}
+    return Representations(
+        data=page, to_json=_serializer("search_tasks", lambda p: encode_page(p["items"], p["next_cursor"]))
+    )
+
+async def stream_tasks(chunk_size: int = EXPORT_CHUNK_SIZE):
+    # Starlette cancels a streaming response through an anyio cancel scope when
+    # the client hangs up, and that cancellation repeats at every await, so the
+    # connection's cleanup never completes and a broken one goes back to the pool.
+    # Reading in a task of its own keeps the database work outside that scope.
+    chunks: asyncio.Queue = asyncio.Queue(1)
+
+    async def produce():
+        try:
+            async with aclosing(get_store().stream_tasks(chunk_size)) as stream:
+                async for rows in stream:
+                    await chunks.put(rows)
+        except Exception as exc:
+            await chunks.put(exc)
+        else:
+            await chunks.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (rows := await chunks.get()) is not None:
+            if isinstance(rows, Exception):
+                raise rows
+            yield rows
+    finally:
+        producer.cancel()
+
+async def get_task(task_id: int, fields: tuple[str, ...] | None = None):
+    key = ("task", task_id)
+    cached = task_cache.get(key)
+    if cached is not None:
+        return cached if fields is None else {name: cached[name] for name in fields}
+    if fields is not None:
+        # Partial rows are not cached; the cache only holds full rows.
+        return await task_reads.do(
+            ("task", task_id, fields), lambda: _db("get_task", get_store().get_task(task_id, fields))
+        )
+    return await task_reads.do(key, lambda: _load_task(task_id))
+
+async def _load_task(task_id: int):
+    generation = task_cache.generation
+    task = await task_loader.load(task_id)
+    if task:
+        task_cache.set(("task", task_id), task, generation)
+    return task
+
+def _encode_set(result: dict) -> bytes:
+    if FAST_RESPONSES:
+        return dumps(result)
+    return TaskSet(**result).model_dump_json().encode()
+
+async def get_tasks_by_ids(task_ids: list[int], fields: tuple[str, ...] | None = None) -> Representations:
+    """The tasks with these ids in the order asked for, plus the ids with no live task."""
+    ids = list(dict.fromkeys(task_ids))
+    found = {}
+    for task_id in ids:
+        cached = task_cache.get(("task", task_id))
+        if cached is not None:
+            found[task_id] = cached
+    wanted = [task_id for task_id in ids if task_id not in found]
+    if wanted:
+        generation = task_cache.generation
+        for task_id, task in zip(wanted, await asyncio.gather(*(task_loader.load(i) for i in wanted))):
+            if task:
+                found[task_id] = task
+                task_cache.set(("task", task_id), task, generation)
+    items = [found[task_id] for task_id in ids if task_id in found]
+    if fields is not None:
+        items = [{name: task[name] for name in fields} for task in items]
+    result = {"items": items, "missing": [task_id for task_id in ids if task_id not in found]}
+    return Representations(
+        data=result, to_json=_serializer("get_tasks_by_ids", _encode_set if fields is None else dumps)
+    )
 
 async def create_task(task: TaskCreate):
-    response = supabase.table("tasks").insert(task.dict()).execute()
-    created_tasks = response.data
-    return created_tasks[0] if created_tasks else None
+    if TASK_WRITE_BATCHING:
+        created = await task_inserts.submit(task.dict())
+    else:
+        created = await _db("create_task", get_store().create_task(task.dict()))
+    if created:
+        _written("created", [created])
+    return created
 
-async def update_task(task_id: int, task_update: TaskUpdate):
+async def _version_conflict(task_id: int):
+    # Only reached when a conditional write matched nothing: tell a stale
+    # version apart from a missing row.
+    current = await _db("get_task", get_store().get_task(task_id))
+    if current:
+        raise PreconditionFailed(current)
+
+async def update_task(task_id: int, task_update: TaskUpdate, version: int | None = None):
+    """Update the task; with ``version``, only if that is still its version.
+
+    Raises PreconditionFailed if the task exists at another version.
+    """
     update_data = {k: v for k, v in task_update.dict(exclude_unset=True).items()}
     if not update_data:
-        return None
-    response = supabase.table("tasks").update(update_data).eq("id", task_id).execute()
-    updated_tasks = response.data
-    return updated_tasks[0] if updated_tasks else None
-
-async def delete_task(task_id: int):
-    response = supabase.table("tasks").delete().eq("id", task_id).execute()
-    deleted_tasks = response.data
-    return deleted_tasks[0] if deleted_tasks else None
+        # Nothing to write: answer with the task as it stands, under the same precondition.
+        current = await _db("get_task", get_store().get_task(task_id))
+        if current and version is not None and current["version"] != version:
+            raise PreconditionFailed(current)
+        return current
+    updated = await _db("update_task", get_store().update_task(task_id, update_data, version))
+    if updated:
+        _written("updated", [updated])
+    elif version is not None:
+        await _version_conflict(task_id)
+    return updated
+
+async def delete_task(task_id: int, version: int | None = None):
+    deleted = await _db("delete_task", get_store().delete_task(task_id, version))
+    if deleted:
+        _deleted([deleted])
+    elif version is not None:
+        await _version_conflict(task_id)
+    return deleted
+
+async def create_tasks(tasks: list[TaskCreate]):
+    created = await _db("create_tasks", get_store().create_tasks([task.dict() for task in tasks]))
+    _written("created", created)
+    return created
+
+async def import_tasks(chunks, summary) -> None:
+    """Bulk-load validated rows, committing each chunk; no events are published, delta sync picks them up.
+
+    ``summary.imported`` counts the rows committed so far, so it is still right
+    when a later chunk fails.
+    """
+    async for rows in chunks:
+        summary.imported += await _db("import_tasks", get_store().import_tasks(rows))
+        _stale_reads(set())
+        task_cache.invalidate(_is_listing)
+
+async def update_tasks(updates: list[TaskBatchUpdate]):
+    """Apply the updates in one write; items that set no fields are only looked up.
+
+    Returns the rows that exist: updated ones, and the others as they stand.
+    """
+    changes = [(u.id, u.dict(exclude_unset=True, exclude={"id"})) for u in updates]
+    untouched = [task_id for task_id, data in changes if not data]
+    changes = [(task_id, data) for task_id, data in changes if data]
+    updated = await _db("update_tasks", get_store().update_tasks(changes)) if changes else []
+    _written("updated", updated)
+    # Looked up together: the loader merges them into one query.
+    current = await asyncio.gather(*(get_task(task_id) for task_id in untouched))
+    return updated + [task for task in current if task]
+
+async def delete_tasks(task_ids: list[int]):
+    deleted = await _db("delete_tasks", get_store().delete_tasks(task_ids))
+    _deleted(deleted)
+    return deleted
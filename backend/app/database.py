@@ -1,25 +1,96 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+from app.pool import engine_options, pool_metrics
+from app.querylog import query_log
+from app.storage.base import TaskStore
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from supabase import Client
 
 load_dotenv()
 
+# Everything heavy (SQLAlchemy, the Supabase client and their imports) is built on
+# first use, so a serverless cold start only pays for the backend it actually uses.
+
+
+def _async_url(url: str) -> str:
+    # Supabase hands out plain postgresql:// URLs; the async engine needs asyncpg.
+    for prefix in ("postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# "sqlalchemy" (default, native async) or "supabase" (REST client, run off-loop)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlalchemy")
+
+@lru_cache
+def get_engine() -> "AsyncEngine":
+    from sqlalchemy.ext.asyncio import create_async_engine
+    url = _async_url(DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url))
+    pool_metrics.attach(engine)
+    # Instead of echo: times every statement and only logs the slow ones.
+    if query_log.enabled:
+        query_log.attach(engine, url)
+    if url.startswith("sqlite"):
+        _use_wal(engine)
+    return engine
+
+
+def _use_wal(engine):
+    # In SQLite's default journal mode one open read (a streaming export, say)
+    # blocks every writer; with WAL readers and the writer no longer wait on each other.
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+@lru_cache
+def get_sessionmaker():
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    return sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
 
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         yield session
 
 
+async def init_db():
+    # Only meant for local stand-ins (SQLite); real databases go through Alembic.
+    from app.models import Base
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+
+@lru_cache
+def get_supabase() -> "Client":
+    from supabase import create_client
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+@lru_cache
+def get_store() -> TaskStore:
+    if STORAGE_BACKEND == "sqlalchemy":
+        from app.storage.sql import SQLAlchemyTaskStore
+        return SQLAlchemyTaskStore(get_engine())
+    if STORAGE_BACKEND == "supabase":
+        from app.storage.supabase_rest import SupabaseTaskStore
+        return SupabaseTaskStore(get_supabase())
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import secrets
+from collections import deque
+from typing import AsyncIterator, Optional
+
+# (event id, event name, JSON data)
+Message = tuple[int, str, str]
+# What subscribers get: the id as sent on the wire, "<epoch>-<event id>".
+Event = tuple[str, str, str]
+
+
+class EventBroker:
+    """Fan-out of task change events to SSE subscribers.
+
+    Each subscriber gets a bounded queue; one that falls ``queue_size`` events
+    behind is disconnected rather than buffered. The last ``history`` events are
+    kept so a reconnecting client can resume from its Last-Event-ID.
+
+    Event ids count up from 1 in each process, so on the wire they carry this
+    broker's random epoch. A Last-Event-ID from another process (a restart, or
+    a reconnect that lands on another worker), or one the history no longer
+    covers, gets a ``reset`` event: the client has to reload.
+    """
+
+    def __init__(self, queue_size: int, history: int, keepalive: float = 15.0):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.published = 0
+        self.dropped = 0
+        self.epoch = secrets.token_hex(4)
+        self._next_id = 1
+        self._history: deque[Message] = deque(maxlen=history)
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def publish(self, event: str, data: dict) -> None:
+        message = (self._next_id, event, json.dumps(data))
+        self._next_id += 1
+        self.published += 1
+        self._history.append(message)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        self.dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _resume_point(self, last_event_id: str) -> Optional[int]:
+        """The id to replay after, or None when this broker can't resume from it."""
+        epoch, _, number = last_event_id.rpartition("-")
+        if epoch != self.epoch or not number.isdigit():
+            return None
+        last = int(number)
+        oldest = self._history[0][0] if self._history else self._next_id
+        if not oldest - 1 <= last < self._next_id:
+            return None
+        return last
+
+    def _event(self, message: Message) -> Event:
+        return (f"{self.epoch}-{message[0]}", message[1], message[2])
+
+    async def listen(self, last_event_id: Optional[str] = None) -> AsyncIterator[Optional[Event]]:
+        """Yield events as they are published; ``None`` means "send a keepalive"."""
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            if last_event_id is not None:
+                resume = self._resume_point(last_event_id)
+                if resume is None:
+                    # Unknown epoch, or too far behind to replay; the client has to reload.
+                    yield self._event((self._next_id - 1, "reset", "{}"))
+                else:
+                    for message in list(self._history):
+                        if message[0] > resume:
+                            yield self._event(message)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    return
+                # The queue was subscribed before the replay, so it only holds newer events.
+                yield self._event(message)
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "history": len(self._history),
+        }
+
+
+task_events = EventBroker(
+    queue_size=int(os.getenv("TASK_EVENTS_QUEUE_SIZE", "100")),
+    history=int(os.getenv("TASK_EVENTS_HISTORY", "1000")),
+)
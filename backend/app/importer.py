@@ -0,0 +1,139 @@
+import csv
+import json
+import os
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
+
+from app.schemas import TaskCreate
+
+# Rows validated and handed to the store at a time; with the error cap this
+# bounds an import's memory however large the upload is.
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+# Longer lines are reported as errors and skipped rather than buffered.
+IMPORT_MAX_LINE = 64 * 1024
+
+CSV_FIELDS = ("title", "description", "status")
+
+
+class ImportSummary:
+    def __init__(self, max_errors: int = IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def result(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _friendly(exc: ValidationError) -> str:
+    # Same wording as the API's 422 handler.
+    return "; ".join(
+        f"Error in {' -> '.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in exc.errors()
+    )
+
+
+async def _lines(body: AsyncIterator[bytes], summary: ImportSummary) -> AsyncIterator[tuple[int, bytes]]:
+    """(line number, line) for each line of the body, holding at most one line in memory."""
+    buffer = b""
+    number = 0
+    skipping = False
+    async for chunk in body:
+        if number == 0 and not buffer and chunk.startswith(b"\xef\xbb\xbf"):
+            chunk = chunk[3:]
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) >= 0:
+            line, start = buffer[start:end], end + 1
+            number += 1
+            if skipping:
+                skipping = False
+                continue
+            yield number, line.rstrip(b"\r")
+        buffer = buffer[start:]
+        if len(buffer) > IMPORT_MAX_LINE and not skipping:
+            summary.error(number + 1, f"Line is longer than {IMPORT_MAX_LINE} bytes")
+            skipping = True
+        if skipping:
+            buffer = b""
+    if buffer and not skipping:
+        yield number + 1, buffer.rstrip(b"\r")
+
+
+async def _ndjson_rows(lines, summary: ImportSummary) -> AsyncIterator[tuple[int, dict]]:
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            summary.error(number, f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(row, dict):
+            summary.error(number, "Expected a JSON object")
+            continue
+        yield number, row
+
+
+async def _csv_rows(lines, summary: ImportSummary) -> AsyncIterator[tuple[int, dict]]:
+    header: Optional[list[str]] = None
+    record, start = "", 0
+    async for number, line in lines:
+        try:
+            text = line.decode()
+        except UnicodeDecodeError:
+            summary.error(number, "Line is not valid UTF-8")
+            continue
+        record, start = (record + "\n" + text, start) if record else (text, number)
+        # A quoted field can hold newlines; the record ends once its quotes balance.
+        if record.count('"') % 2:
+            if len(record) > IMPORT_MAX_LINE:
+                summary.error(start, f"Record is longer than {IMPORT_MAX_LINE} bytes")
+                record = ""
+            continue
+        values, record = next(csv.reader([record])), ""
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if "title" not in header:
+                summary.error(start, "CSV header must include a title column")
+                return
+            continue
+        if not any(value.strip() for value in values):
+            continue
+        row = {name: value for name, value in zip(header, values) if name in CSV_FIELDS}
+        # An empty cell means "not given", so the model's defaults apply.
+        yield start, {name: value for name, value in row.items() if value != "" or name == "title"}
+    if record:
+        summary.error(start, "Unterminated quoted field")
+
+
+async def validated_chunks(
+    body: AsyncIterator[bytes], format: str, summary: ImportSummary, chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> AsyncIterator[list[dict]]:
+    """Valid rows from an NDJSON or CSV body, ``chunk_size`` at a time; invalid ones go to ``summary``."""
+    parse = _csv_rows if format == "csv" else _ndjson_rows
+    chunk = []
+    async for number, row in parse(_lines(body, summary), summary):
+        try:
+            task = TaskCreate.model_validate(row)
+        except ValidationError as exc:
+            summary.error(number, _friendly(exc))
+            continue
+        chunk.append(task.model_dump(mode="json"))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+from app.pool import DB_POOL_MODE
+from app.telemetry import Counter, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+# Filled by the tasks_notify_* triggers (see the notify_task_changes migration).
+CHANNEL = "task_changes"
+
+# On by default on Postgres: besides the cache, in-flight coalesced reads that
+# began before another worker's write must not be shared with later callers.
+TASK_CACHE_LISTEN = os.getenv("TASK_CACHE_LISTEN", "1") == "1"
+# LISTEN needs a session of its own, which a transaction-mode pooler doesn't
+# give; point this at the direct (port 5432) connection string in that case.
+TASK_CACHE_LISTEN_URL = os.getenv("TASK_CACHE_LISTEN_URL") or os.getenv("DATABASE_URL")
+_LISTEN_THROUGH_POOLER = not os.getenv("TASK_CACHE_LISTEN_URL") and DB_POOL_MODE == "pooler"
+# How often an idle listener checks its connection is still alive.
+TASK_CACHE_LISTEN_KEEPALIVE = float(os.getenv("TASK_CACHE_LISTEN_KEEPALIVE", "30"))
+
+invalidations = registry.register(Counter(
+    "task_cache_remote_invalidations_total",
+    "Change notifications received from other workers, by whether they named rows or evicted everything.",
+    ("scope",),
+))
+invalidation_lag = registry.register(Histogram(
+    "task_cache_invalidation_lag_seconds", "Time from a write's trigger firing to the eviction in this worker.",
+))
+
+
+def can_listen(url: Optional[str]) -> bool:
+    if not (TASK_CACHE_LISTEN and url and url.startswith(("postgresql", "postgres://"))):
+        return False
+    if _LISTEN_THROUGH_POOLER:
+        # Notifications through a transaction-mode pooler go missing, and caches
+        # would silently stay stale for the whole TTL; better to say so and not listen.
+        logger.warning(
+            "task change listener disabled: DB_POOL_MODE=pooler needs TASK_CACHE_LISTEN_URL set to a "
+            "direct connection; other workers' writes stay cached for up to TASK_CACHE_TTL"
+        )
+        return False
+    return True
+
+
+class ChangeListener:
+    """Keeps a LISTEN connection open and reports other workers' task writes.
+
+    ``on_change`` gets the changed ids, or None when they're unknown (too many
+    for one notification, or notifications may have been missed while
+    reconnecting) and everything cached has to go. Writes made through this
+    worker's own engine are recognised by backend pid and skipped: crud has
+    already dealt with them.
+    """
+
+    def __init__(self, on_change: Callable[[Optional[set[int]]], None]):
+        self.on_change = on_change
+        self.connected = False
+        self.received = 0
+        self.ignored = 0
+        self.malformed = 0
+        self.reconnects = 0
+        self._own_pids: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def track(self, engine) -> None:
+        """Remember the backend pids of ``engine``'s connections."""
+        from sqlalchemy import event
+
+        @event.listens_for(engine.sync_engine.pool, "connect")
+        def on_connect(dbapi_connection, record):
+            record.info["pid"] = dbapi_connection.driver_connection.get_server_pid()
+            self._own_pids.add(record.info["pid"])
+
+        @event.listens_for(engine.sync_engine.pool, "close")
+        def on_close(dbapi_connection, record):
+            self._own_pids.discard(record.info.pop("pid", None))
+
+    def start(self, url: str) -> None:
+        self._task = asyncio.create_task(self._run(url))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, url: str) -> None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.pool import NullPool
+        from app.database import _async_url
+
+        engine = create_async_engine(_async_url(url), poolclass=NullPool)
+        backoff = 0.5
+        try:
+            while True:
+                try:
+                    await self._listen(engine)
+                    backoff = 0.5
+                except Exception as exc:
+                    logger.warning("task change listener disconnected: %s", exc)
+                self.connected = False
+                self.reconnects += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+        finally:
+            await engine.dispose()
+
+    async def _listen(self, engine) -> None:
+        async with engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            lost = asyncio.Event()
+            raw.add_termination_listener(lambda connection: lost.set())
+            await raw.add_listener(CHANNEL, self._notified)
+            # Anything written while we weren't listening went unannounced.
+            self.on_change(None)
+            self.connected = True
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), TASK_CACHE_LISTEN_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    await raw.execute("SELECT 1")
+            raise ConnectionError("connection closed")
+
+    def _notified(self, connection, pid: int, channel: str, payload: str) -> None:
+        if pid in self._own_pids:
+            self.ignored += 1
+            return
+        self.received += 1
+        fired_at, _, ids = payload.partition(" ")
+        try:
+            changed = {int(task_id) for task_id in ids.split(",")} if ids else None
+            lag = max(time.time() - float(fired_at), 0)
+        except ValueError:
+            # Not a payload we understand; which rows changed is unknown, so evict everything.
+            logger.warning("malformed task change notification: %r", payload[:200])
+            self.malformed += 1
+            changed, lag = None, None
+        invalidations.inc("rows" if changed else "all")
+        self.on_change(changed)
+        if lag is not None:
+            invalidation_lag.observe(lag)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "ignored_own": self.ignored,
+            "malformed": self.malformed,
+            "reconnects": self.reconnects,
+        }
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class BatchLoader:
+    """Merges the single-key loads made during one event loop tick into one call.
+
+    ``load_many`` receives the distinct keys, in the order they were first
+    asked for, and must return one result per key in that order, None for a
+    key that doesn't exist. Each ``load`` gets its own key's result back, so
+    concurrent requests can share a query without seeing each other's rows.
+    """
+
+    def __init__(self, load_many: Callable[[list], Awaitable[list]], max_batch: int):
+        self.load_many = load_many
+        self.max_batch = max_batch
+        self.batches = 0
+        self.keys = 0
+        self.loads = 0
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._scheduled = False
+        # The loop only holds tasks weakly; these keep in-flight loads alive.
+        self._loading: set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Optional[Any]:
+        self.loads += 1
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif not self._scheduled:
+                self._scheduled = True
+                asyncio.get_running_loop().call_soon(self._dispatch)
+        # Shielded so one caller going away doesn't fail the key for the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._load(batch))
+            self._loading.add(task)
+            task.add_done_callback(self._loading.discard)
+
+    async def _load(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        self.batches += 1
+        self.keys += len(batch)
+        try:
+            results = await self.load_many(list(batch))
+            if len(results) != len(batch):
+                # Results can't be matched to keys, so none of them are trusted.
+                raise RuntimeError(f"load_many returned {len(results)} results for {len(batch)} keys")
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()  # don't warn when nobody is left waiting
+            return
+        for future, result in zip(batch.values(), results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "keys": self.keys,
+            "loads": self.loads,
+        }
@@ -1,15 +1,39 @@
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.encoders import jsonable_encoder
 
-from app.routers import tasks
-from app.models import Base
-from app.database import engine
+from app.routers import tasks, metrics
+from app import database
+from app.pool import DB_POOL_PREWARM, prewarm
+from app.crud import task_changes, tombstone_purger
+from app.invalidation import TASK_CACHE_LISTEN_URL, can_listen
+from app.telemetry import MetricsMiddleware
+from app.admission import AdmissionMiddleware
+from app.serialization import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Started before the prewarm so this worker's connections are known and
+    # its own writes skipped.
+    if can_listen(TASK_CACHE_LISTEN_URL):
+        if database.STORAGE_BACKEND == "sqlalchemy":
+            task_changes.track(database.get_engine())
+        task_changes.start(TASK_CACHE_LISTEN_URL)
+    if DB_POOL_PREWARM > 0 and database.STORAGE_BACKEND == "sqlalchemy":
+        await prewarm(database.get_engine(), DB_POOL_PREWARM)
+    tombstone_purger.start()
+    yield
+    await tombstone_purger.stop()
+    await task_changes.stop()
+
 
-app = FastAPI(title="Task Manager API")
+app = FastAPI(title="Task Manager API", lifespan=lifespan)
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -18,19 +42,24 @@ origins = [
     "http://127.0.0.1:8000",
 ]
 
+# Compression is innermost so it sees each route's own headers; admission
+# sits outside it, so shed requests still get CORS headers and show up in the metrics.
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Be cautious with "*" in production
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Startup event for DB table creation
 # @app.on_event("startup")
 # async def startup():
-#     async with engine.begin() as conn:
-#         await conn.run_sync(Base.metadata.create_all)
+#     await init_db()
 
 # Validation error handler to return friendly error messages
 @app.exception_handler(RequestValidationError)
@@ -58,4 +87,5 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 #         content={"detail": "Internal Server Error"},
 #     )
 
-app.include_router(tasks.router)
\ No newline at end of file
+app.include_router(tasks.router)
+app.include_router(metrics.router)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum
+from sqlalchemy import Column, Integer, SmallInteger, BigInteger, String, Enum, DateTime, DDL, Index, event, text
 from sqlalchemy.ext.declarative import declarative_base
 import enum
 
@@ -14,3 +14,105 @@ class Task(Base):
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
     status = Column(Enum(StatusEnum), default=StatusEnum.pending)
+    # Assigned by the database on every insert/update: the writing transaction's
+    # id on Postgres (migration 88612a7ae672), a counter on SQLite.
+    change_version = Column(BigInteger, nullable=False, server_default="0", index=True)
+    # Soft-delete tombstone so delta sync can report deletions.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped by every write; If-Match compares against it (migration db7d32e12249).
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __table_args__ = (
+        # Serves ?status= pages: WHERE status = :s AND id < :cursor ORDER BY id DESC.
+        Index(
+            "ix_tasks_status_id", "status", text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        # Finds tombstones past their retention period.
+        Index(
+            "ix_tasks_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
+class TaskChangeCounter(Base):
+    # Only the SQLite stand-in still counts from here; its writers are serialized anyway.
+    __tablename__ = "task_change_counter"
+    id = Column(SmallInteger, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+class TaskTombstonePurge(Base):
+    # Highest change_version among purged tombstones; delta sync from before it would miss deletes.
+    __tablename__ = "task_tombstone_purges"
+    id = Column(SmallInteger, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+class TaskStatusCount(Base):
+    __tablename__ = "task_status_counts"
+    status = Column(Enum(StatusEnum), primary_key=True)
+    count = Column(BigInteger, nullable=False)
+
+
+# Postgres gets its triggers from Alembic; these mirror them for SQLite stand-ins
+# created with Base.metadata.create_all.
+_SQLITE_BUMP_VERSION = """
+    UPDATE task_change_counter SET version = version + 1 WHERE id = 1;
+    UPDATE tasks SET change_version = (SELECT version FROM task_change_counter WHERE id = 1)
+    WHERE id = NEW.id;
+"""
+
+event.listen(
+    TaskChangeCounter.__table__, "after_create",
+    DDL("INSERT INTO task_change_counter (id, version) VALUES (1, 0)").execute_if(dialect="sqlite"),
+)
+event.listen(
+    TaskTombstonePurge.__table__, "after_create",
+    DDL("INSERT INTO task_tombstone_purges (id, version) VALUES (1, 0)").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Task.__table__, "after_create",
+    DDL(f"CREATE TRIGGER tasks_change_version_insert AFTER INSERT ON tasks BEGIN {_SQLITE_BUMP_VERSION} END").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Task.__table__, "after_create",
+    DDL(
+        "CREATE TRIGGER tasks_change_version_update AFTER UPDATE OF title, description, status, deleted_at "
+        f"ON tasks BEGIN {_SQLITE_BUMP_VERSION} END"
+    ).execute_if(dialect="sqlite"),
+)
+
+# SQLite has no tsvector; search falls back to an FTS5 index kept in sync by triggers.
+for _ddl in (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='id')",
+    """CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+    END""",
+    """CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+    END""",
+    """CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END""",
+):
+    event.listen(Task.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+
+event.listen(
+    TaskStatusCount.__table__, "after_create",
+    DDL("INSERT INTO task_status_counts (status, count) VALUES ('pending', 0), ('done', 0)").execute_if(dialect="sqlite"),
+)
+for _ddl in (
+    """CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks WHEN NEW.deleted_at IS NULL BEGIN
+        UPDATE task_status_counts SET count = count + 1 WHERE status = NEW.status;
+    END""",
+    """CREATE TRIGGER tasks_status_counts_update AFTER UPDATE OF status, deleted_at ON tasks BEGIN
+        UPDATE task_status_counts SET count = count - 1 WHERE status = OLD.status AND OLD.deleted_at IS NULL;
+        UPDATE task_status_counts SET count = count + 1 WHERE status = NEW.status AND NEW.deleted_at IS NULL;
+    END""",
+    """CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks WHEN OLD.deleted_at IS NULL BEGIN
+        UPDATE task_status_counts SET count = count - 1 WHERE status = OLD.status;
+    END""",
+):
+    event.listen(Task.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import time
+import uuid
+
+# "queue":  app-side pool of long-lived connections (default)
+# "pooler": app-side pool in front of Supabase's transaction pooler (PgBouncer in
+#           transaction mode, port 6543), with asyncpg's statement caches disabled
+# "null":   no app-side pool; every checkout opens a fresh connection
+POOL_MODES = ("queue", "pooler", "null")
+
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+# Connections to open at startup so the first requests don't pay for TCP+TLS.
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", "0"))
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.pool = None
+        self.checked_out = 0
+        self.connects = 0
+        self.acquires = 0
+        self.acquire_seconds = 0.0
+        self.acquire_max_seconds = 0.0
+
+    def record_acquire(self, seconds: float) -> None:
+        self.acquires += 1
+        self.acquire_seconds += seconds
+        self.acquire_max_seconds = max(self.acquire_max_seconds, seconds)
+
+    def attach(self, engine) -> None:
+        from sqlalchemy import event
+
+        self.pool = engine.sync_engine.pool
+
+        @event.listens_for(self.pool, "connect")
+        def on_connect(dbapi_connection, record):
+            self.connects += 1
+
+        @event.listens_for(self.pool, "checkout")
+        def on_checkout(dbapi_connection, record, proxy):
+            self.checked_out += 1
+
+        @event.listens_for(self.pool, "checkin")
+        def on_checkin(dbapi_connection, record):
+            self.checked_out -= 1
+
+    def stats(self) -> dict:
+        pool = self.pool
+        return {
+            "mode": DB_POOL_MODE,
+            "size": pool.size() if hasattr(pool, "size") else 0,
+            "checked_out": self.checked_out,
+            "idle": pool.checkedin() if hasattr(pool, "checkedin") else 0,
+            "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+            "connects": self.connects,
+            "acquires": self.acquires,
+            "acquire_wait_seconds_total": round(self.acquire_seconds, 6),
+            "acquire_wait_seconds_max": round(self.acquire_max_seconds, 6),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _timed(pool_class):
+    # _do_get is where a checkout waits for a free (or new) connection.
+    class TimedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                pool_metrics.record_acquire(time.perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def engine_options(url: str) -> dict:
+    from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+    if DB_POOL_MODE not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE: {DB_POOL_MODE}")
+    if DB_POOL_MODE == "null":
+        return {"poolclass": _timed(NullPool)}
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        return {}  # in-memory SQLite needs its single StaticPool connection
+    options = {
+        "poolclass": _timed(AsyncAdaptedQueuePool),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if url.startswith("sqlite"):
+        # The local stand-in: writers queue on one file lock, so wait for it rather
+        # than failing after sqlite3's 5s default, and check connections before use
+        # since one torn down by a cancelled request can be left behind unusable.
+        options["connect_args"] = {"timeout": 30}
+        options["pool_pre_ping"] = True
+    if DB_POOL_MODE == "pooler":
+        # PgBouncer in transaction mode may run each transaction on a different
+        # server connection, so statements prepared on one are missing on the next.
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
+
+async def prewarm(engine, connections: int) -> None:
+    # Hold every connection until all are open so the pool can't hand the same
+    # one out twice; never ask for more than the pool can give without waiting.
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size() + max(pool._max_overflow, 0))
+    if connections <= 0:
+        return
+    barrier = asyncio.Barrier(connections)
+
+    async def open_one():
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+            await barrier.wait()
+
+    await asyncio.gather(*(open_one() for _ in range(connections)))
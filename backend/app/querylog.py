@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import time
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged (0 logs every statement, a negative
+# value turns the whole hook off). Every statement is still timed and counted
+# per fingerprint for the top-N report.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Fraction of slow SELECTs whose plan is captured with EXPLAIN (ANALYZE, BUFFERS).
+# ANALYZE runs the query a second time, so keep this off or low in production.
+QUERY_EXPLAIN_SAMPLE = float(os.getenv("QUERY_EXPLAIN_SAMPLE", "0"))
+# Distinct fingerprints kept; past that the one with the least total time goes.
+QUERY_STATS_SIZE = int(os.getenv("QUERY_STATS_SIZE", "200"))
+# A fingerprint's plan is refreshed at most this often.
+EXPLAIN_INTERVAL = 60.0
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|\$\d+)(?:\s*,\s*(?:\?|\$\d+))+\s*\)")
+_PLACEHOLDER = re.compile(r"\$\d+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple[str, str]:
+    """(short id, normalized text) for a statement, ignoring literal values and IN-list length."""
+    normalized = _SPACE.sub(" ", statement).strip()
+    normalized = _LITERAL.sub("?", _PLACEHOLDER.sub("?", normalized))
+    normalized = _PLACEHOLDER_LIST.sub("(?, ...)", normalized)
+    return hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest(), normalized
+
+
+class QueryStats:
+    __slots__ = ("statement", "calls", "slow", "total", "max", "plan", "plan_at")
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.calls = 0
+        self.slow = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.plan: Optional[str] = None
+        self.plan_at = 0.0
+
+
+class QueryLog:
+    """Times every statement on an engine, per fingerprint, and logs the slow ones.
+
+    Plans for sampled slow SELECTs are captured in a background task on a
+    connection of their own, so the request that ran the query never waits on it.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample: float, max_fingerprints: int):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample = explain_sample
+        self.max_fingerprints = max_fingerprints
+        self.explains = 0
+        self._stats: dict[str, QueryStats] = {}
+        self._explaining: set[str] = set()
+        self._explain_engine = None
+        self._url: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold >= 0
+
+    def attach(self, engine, url: str) -> None:
+        from sqlalchemy import event
+
+        self._url = url
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before(conn, cursor, statement, parameters, context, executemany):
+            context.query_started = time.perf_counter()
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after(conn, cursor, statement, parameters, context, executemany):
+            self.record(statement, parameters, time.perf_counter() - context.query_started)
+
+    def record(self, statement: str, parameters, elapsed: float) -> None:
+        key, normalized = fingerprint(statement)
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                del self._stats[min(self._stats, key=lambda k: self._stats[k].total)]
+            stats = self._stats[key] = QueryStats(normalized)
+        stats.calls += 1
+        stats.total += elapsed
+        stats.max = max(stats.max, elapsed)
+        if elapsed < self.threshold:
+            return
+        stats.slow += 1
+        logger.warning("slow query %.1fms [%s] %s", elapsed * 1000, key, normalized)
+        if self._should_explain(key, stats, normalized):
+            self._explaining.add(key)
+            asyncio.get_running_loop().create_task(self._explain(key, statement, parameters))
+
+    def _should_explain(self, key: str, stats: QueryStats, normalized: str) -> bool:
+        # EXPLAIN ANALYZE executes the statement, so only ever for plain reads.
+        return (
+            self.explain_sample > 0
+            and normalized[:7].upper() == "SELECT "
+            and " FOR UPDATE" not in normalized.upper()
+            and key not in self._explaining
+            and time.monotonic() - stats.plan_at >= EXPLAIN_INTERVAL
+            and random.random() < self.explain_sample
+        )
+
+    async def _explain(self, key: str, statement: str, parameters) -> None:
+        try:
+            engine = self._get_explain_engine()
+            postgres = engine.dialect.name == "postgresql"
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) " if postgres else "EXPLAIN QUERY PLAN "
+            async with engine.connect() as conn:
+                if postgres:
+                    # LOCAL: ends with the rolled-back transaction, so it can't stay
+                    # behind on a server connection a pooler hands to someone else.
+                    await conn.exec_driver_sql("SET LOCAL statement_timeout = '5s'")
+                result = await conn.exec_driver_sql(prefix + statement, parameters)
+                plan = "\n".join(" ".join(str(value) for value in row) for row in result)
+                await conn.rollback()
+        except Exception as exc:
+            logger.warning("could not explain query [%s]: %s", key, exc)
+            return
+        finally:
+            self._explaining.discard(key)
+        stats = self._stats.get(key)
+        if stats is not None:
+            self.explains += 1
+            stats.plan = plan
+            stats.plan_at = time.monotonic()
+            logger.warning("plan for slow query [%s]:\n%s", key, plan)
+
+    def _get_explain_engine(self):
+        # Not the app's pool: a plan capture never holds a connection a request needs.
+        # It does need the pool's connect_args, such as the prepared statement
+        # settings a transaction-mode pooler requires.
+        if self._explain_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            from sqlalchemy.pool import NullPool
+            from app.pool import engine_options
+            connect_args = engine_options(self._url).get("connect_args", {})
+            self._explain_engine = create_async_engine(self._url, poolclass=NullPool, connect_args=connect_args)
+        return self._explain_engine
+
+    def top(self, limit: int = 10, order: str = "total") -> list[dict]:
+        keys = {
+            "total": lambda item: item[1].total,
+            "mean": lambda item: item[1].total / item[1].calls,
+            "max": lambda item: item[1].max,
+            "calls": lambda item: item[1].calls,
+        }
+        ranked = sorted(self._stats.items(), key=keys[order], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": key,
+                "statement": stats.statement,
+                "calls": stats.calls,
+                "slow": stats.slow,
+                "total_ms": round(stats.total * 1000, 2),
+                "mean_ms": round(stats.total / stats.calls * 1000, 3),
+                "max_ms": round(stats.max * 1000, 2),
+                "plan": stats.plan,
+            }
+            for key, stats in ranked
+        ]
+
+
+query_log = QueryLog(SLOW_QUERY_MS, QUERY_EXPLAIN_SAMPLE, QUERY_STATS_SIZE)
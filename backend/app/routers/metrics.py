@@ -0,0 +1,50 @@
+from typing import Literal
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+from app.admission import read_admission, write_admission
+from app.cache import task_cache
+from app.crud import task_changes, task_inserts, task_loader, tombstone_purger
+from app.events import task_events
+from app.database import get_engine
+from app.pool import pool_metrics
+from app.querylog import query_log
+from app.singleflight import task_reads
+from app.telemetry import Gauge, registry
+
+router = APIRouter()
+
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Pooled database connections by state.", ("state",),
+))
+db_pool_wait_seconds = registry.register(Gauge(
+    "db_pool_acquire_wait_seconds_total", "Total time spent waiting to check out a connection.",
+))
+
+@router.get("/stats")
+async def read_stats():
+    stats = {"cache": task_cache.stats(), "events": task_events.stats(), "reads": task_reads.stats(),
+             "loads": task_loader.stats(),
+             "writes": task_inserts.stats(), "invalidation": task_changes.stats(),
+             "tombstones": tombstone_purger.stats(),
+             "admission": {"read": read_admission.stats(), "write": write_admission.stats()}}
+    if get_engine.cache_info().currsize:  # don't build the engine just to report on it
+        stats["pool"] = pool_metrics.stats()
+    return stats
+
+@router.get("/stats/queries")
+async def read_query_stats(
+    limit: int = Query(10, ge=1, le=100),
+    order: Literal["total", "mean", "max", "calls"] = "total",
+):
+    return {"threshold_ms": query_log.threshold * 1000, "explains": query_log.explains,
+            "queries": query_log.top(limit, order)}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    if get_engine.cache_info().currsize:
+        pool = pool_metrics.stats()
+        db_pool_connections.set(pool["checked_out"], "checked_out")
+        db_pool_connections.set(pool["idle"], "idle")
+        db_pool_connections.set(pool["overflow"], "overflow")
+        db_pool_wait_seconds.set(pool["acquire_wait_seconds_total"])
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
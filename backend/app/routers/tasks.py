@@ -1,22 +1,210 @@
-from fastapi import APIRouter, HTTPException, status
-from app.schemas import Task, TaskCreate, TaskUpdate
-from app.crud import get_tasks, get_task, create_task, update_task, delete_task
+import csv
+import io
+from typing import Annotated, Literal, Optional, Union
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import Field
+from app.schemas import (
+    StatusEnum, TaskStats, Task, TaskCreate, TaskUpdate, TaskPage, TaskChanges, TaskSet,
+    TaskBatchUpdate, TaskBatchDelete, TaskBatchResult, TaskImportResult, MAX_BATCH_SIZE,
+)
+from app.crud import (
+    get_tasks_page, get_tasks_by_ids, get_stats, get_changes, search_tasks, stream_tasks, get_task, create_task, update_task, delete_task,
+    create_tasks, import_tasks, update_tasks, delete_tasks,
+)
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+from app.conditional import PreconditionFailed, if_match_version, task_etag, etag_matches
+from app.events import task_events
+from app.tombstones import ChangesPurged
+from app.importer import ImportSummary, validated_chunks
+from app.serialization import (
+    FAST_RESPONSES, MSGPACK, Representations, dumps, negotiate_encoding, negotiate_media_type,
+)
 
 router = APIRouter()
 
-@router.get("/tasks", response_model=list[Task])
-async def read_tasks():
+TASK_FIELDS = ["id", "title", "description", "status", "version"]
+
+FIELDS_QUERY = Query(None, description="Comma-separated subset of task fields to return, e.g. id,title")
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - Task.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # id is always returned: it identifies the row and drives the cursor.
+    requested.add("id")
+    if requested == Task.model_fields.keys():
+        return None
+    return tuple(name for name in TASK_FIELDS if name in requested)
+
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids cannot be empty")
+    if len(parsed) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    return parsed
+
+def _respond(request: Request, representations: Representations, if_none_match: Optional[str] = None) -> Response:
+    """The variant of an already-built body that the client's Accept headers ask for."""
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    accepted_encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    etag = representations.etag_for(media_type, accepted_encoding)
+    if etag:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "no-cache"
+        # Checked before the body is touched: a 304 never encodes or compresses anything.
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    body, _, encoding = representations.get(media_type, accepted_encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+@router.get("/tasks", response_model=Union[TaskPage, TaskChanges, TaskSet])
+async def read_tasks(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    task_status: Optional[StatusEnum] = Query(None, alias="status"),
+    since: Optional[int] = Query(None, ge=0, description="Only return changes after this version"),
+    ids: Optional[str] = Query(None, description="Comma-separated task ids to fetch in one request"),
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = Header(None),
+):
+    projection = _parse_fields(fields)
+    if ids is not None:
+        if cursor or task_status or since is not None:
+            raise HTTPException(status_code=400, detail="ids cannot be combined with cursor, status or since")
+        task_ids = _parse_ids(ids)
+        try:
+            found = await get_tasks_by_ids(task_ids, projection)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return _respond(request, found)
+    if since is not None:
+        if task_status or projection:
+            raise HTTPException(status_code=400, detail="since cannot be combined with status or fields")
+        if cursor and since:
+            raise HTTPException(status_code=400, detail="cursor only continues a full sync (since=0)")
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        try:
+            changes = await get_changes(since, limit, after)
+        except ChangesPurged as e:
+            raise HTTPException(status_code=410, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return _respond(request, changes)
+    try:
+        before_id = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        # Already serialized (and possibly cached), so skip response_model encoding.
+        page = await get_tasks_page(
+            limit, before_id, task_status.value if task_status else None, projection
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _respond(request, page, if_none_match)
+
+@router.get("/tasks/stats", response_model=TaskStats)
+async def read_stats():
+    try:
+        return await get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/tasks/search", response_model=TaskPage)
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    try:
+        offset = decode_cursor(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be blank")
     try:
-        return await get_tasks()
+        results = await search_tasks(q, limit, offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return _respond(request, results)
+
+async def _export_chunks(request: Request, format: str):
+    if format == "csv":
+        yield ",".join(TASK_FIELDS) + "\r\n"
+    async for rows in stream_tasks():
+        if await request.is_disconnected():
+            return
+        if format == "csv":
+            buffer = io.StringIO()
+            csv.DictWriter(buffer, TASK_FIELDS, extrasaction="ignore").writerows(rows)
+            yield buffer.getvalue()
+        else:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+
+@router.get("/tasks/export")
+async def export_tasks(request: Request, format: Literal["ndjson", "csv"] = "ndjson"):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    return StreamingResponse(_export_chunks(request, format), media_type=media_type, headers=headers)
+
+async def _event_stream(last_event_id: Optional[str]):
+    async for message in task_events.listen(last_event_id):
+        if message is None:
+            yield ": keepalive\n\n"
+        else:
+            event_id, event, data = message
+            yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+@router.get("/tasks/events")
+async def task_event_stream(last_event_id: Optional[str] = Header(None)):
+    # An id this worker didn't issue is answered with a reset event, not an error.
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_event_stream(last_event_id), media_type="text/event-stream", headers=headers)
 
 @router.get("/tasks/{task_id}", response_model=Task)
-async def read_task(task_id: int):
+async def read_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = Header(None),
+):
+    projection = _parse_fields(fields)
+    # The version is read even when not asked for, so the ETag is always one If-Match accepts.
+    hidden_version = projection is not None and "version" not in projection
     try:
-        task = await get_task(task_id)
+        task = await get_task(task_id, fields=projection + ("version",) if hidden_version else projection)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
+        etag = task_etag(task)
+        if hidden_version:
+            # A copy: coalesced callers share the row.
+            task = {name: value for name, value in task.items() if name != "version"}
+        if projection is not None or FAST_RESPONSES or negotiate_media_type(request.headers.get("accept")) == MSGPACK:
+            # Partial rows would fail response_model validation; full rows are trusted in fast mode.
+            return _respond(request, Representations(etag=etag, data=task), if_none_match)
+        # A 304 carries the same validator and caching headers as the 200 it stands for.
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
         return task
     except HTTPException:
         raise
@@ -30,25 +218,99 @@ async def add_task(task: TaskCreate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/tasks/batch", response_model=list[TaskBatchResult], status_code=status.HTTP_201_CREATED)
+async def add_tasks(tasks: Annotated[list[TaskCreate], Field(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    try:
+        created = await create_tasks(tasks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return [
+        {"index": i, "id": task["id"], "status": "created", "task": task}
+        for i, task in enumerate(created)
+    ]
+
+@router.post("/tasks/import", response_model=TaskImportResult)
+async def import_task_file(request: Request, format: Optional[Literal["ndjson", "csv"]] = None):
+    # The body is read, validated and loaded a chunk at a time, never held whole.
+    if format is None:
+        format = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+    summary = ImportSummary()
+    try:
+        await import_tasks(validated_chunks(request.stream(), format, summary), summary)
+    except Exception as e:
+        # Chunks commit one by one; say how far the import got before it failed.
+        raise HTTPException(status_code=500, detail={"error": str(e), **summary.result()})
+    return summary.result()
+
+@router.patch("/tasks/batch", response_model=list[TaskBatchResult])
+async def edit_tasks(updates: Annotated[list[TaskBatchUpdate], Field(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    ids = [u.id for u in updates]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate task id in batch")
+    try:
+        updated = {task["id"]: task for task in await update_tasks(updates)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    results = []
+    for i, u in enumerate(updates):
+        if u.id in updated and len(u.model_fields_set) == 1:
+            results.append({"index": i, "id": u.id, "status": "unchanged", "task": updated[u.id]})
+        elif u.id in updated:
+            results.append({"index": i, "id": u.id, "status": "updated", "task": updated[u.id]})
+        else:
+            results.append({"index": i, "id": u.id, "status": "not_found"})
+    return results
+
+@router.delete("/tasks/batch", response_model=list[TaskBatchResult])
+async def remove_tasks(batch: TaskBatchDelete):
+    try:
+        deleted = {task["id"]: task for task in await delete_tasks(list(dict.fromkeys(batch.ids)))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    results = []
+    for i, task_id in enumerate(batch.ids):
+        # A repeated id was already deleted by its first occurrence.
+        if task_id in deleted:
+            results.append({"index": i, "id": task_id, "status": "deleted", "task": deleted.pop(task_id)})
+        else:
+            results.append({"index": i, "id": task_id, "status": "not_found"})
+    return results
+
+def _not_found(if_match: Optional[str]) -> HTTPException:
+    # With no current representation, no If-Match (not even *) can match: 412, not 404 (RFC 9110 13.1.1).
+    if if_match is not None:
+        return HTTPException(status_code=412, detail="Task does not exist")
+    return HTTPException(status_code=404, detail="Task not found")
+
+def _precondition_failed(exc: PreconditionFailed) -> HTTPException:
+    return HTTPException(status_code=412, detail=str(exc), headers={"ETag": task_etag(exc.current)})
+
 @router.post("/tasks/{task_id}", response_model=Task)
-async def edit_task(task_id: int, task_update: TaskUpdate):
+async def edit_task(task_id: int, task_update: TaskUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    version = if_match_version(if_match) if if_match is not None else None
     try:
-        updated_task = await update_task(task_id, task_update)
+        updated_task = await update_task(task_id, task_update, version)
         if not updated_task:
-            raise HTTPException(status_code=404, detail="Task not found")
+            raise _not_found(if_match)
+        response.headers["ETag"] = task_etag(updated_task)
         return updated_task
+    except PreconditionFailed as e:
+        raise _precondition_failed(e)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/tasks/{task_id}", response_model=Task)
-async def remove_task(task_id: int):
+async def remove_task(task_id: int, if_match: Optional[str] = Header(None)):
+    version = if_match_version(if_match) if if_match is not None else None
     try:
-        deleted_task = await delete_task(task_id)
+        deleted_task = await delete_task(task_id, version)
         if not deleted_task:
-            raise HTTPException(status_code=404, detail="Task not found")
+            raise _not_found(if_match)
         return deleted_task
+    except PreconditionFailed as e:
+        raise _precondition_failed(e)
     except HTTPException:
         raise
     except Exception as e:
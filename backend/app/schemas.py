@@ -1,7 +1,7 @@
 # app/schemas.py
 
 from pydantic import BaseModel, Field, ConfigDict, validator
-from typing import Optional
+from typing import Literal, Optional
 from enum import Enum
 
 
@@ -25,12 +25,11 @@ class TaskBase(BaseModel):
 
 
 class TaskCreate(TaskBase):
-    title: str
-    description: Optional[str] = None
-    status: StatusEnum = StatusEnum.pending
-
     model_config = ConfigDict(from_attributes=True)
 
+MAX_BATCH_SIZE = 500
+
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
@@ -38,14 +37,76 @@ class TaskUpdate(BaseModel):
 
     model_config = ConfigDict(from_attributes=True, validate_assignment=True)
 
+    # Validators only run on fields that were sent, so these reject an explicit
+    # null without making the fields required.
     @validator('title')
     def title_if_present_not_blank(cls, v):
-        if v is not None and not v.strip():
+        if v is None:
+            raise ValueError('Title cannot be null')
+        if not v.strip():
             raise ValueError('Title cannot be empty or blank spaces')
         return v
 
+    @validator('status')
+    def status_if_present_not_null(cls, v):
+        if v is None:
+            raise ValueError('Status cannot be null')
+        return v
+
 
 class Task(TaskBase):
     id: int
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TaskPage(BaseModel):
+    items: list[Task]
+    next_cursor: Optional[str] = None
+
+
+class TaskSet(BaseModel):
+    items: list[Task]
+    missing: list[int]
+
+
+class TaskImportError(BaseModel):
+    line: int
+    error: str
+
+
+class TaskImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TaskImportError]
+    errors_truncated: bool
+
+
+class TaskStats(BaseModel):
+    counts: dict[StatusEnum, int]
+    total: int
+
+
+class TaskChanges(BaseModel):
+    items: list[Task]
+    deleted: list[int]
+    version: int
+    has_more: bool
+    # Set while a full sync (since=0) has more pages: pass it back as cursor.
+    next_cursor: Optional[str] = None
+
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "not_found", "unchanged"]
+    task: Optional[Task] = None
@@ -0,0 +1,197 @@
+import gzip
+import json
+import os
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
+
+from app.conditional import variant_etag
+from app.schemas import TaskPage
+
+try:
+    import orjson
+except ImportError:  # optional; pydantic-core's serializer is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional; without it every response is JSON
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # optional; without it gzip is the only compression offered
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# Bodies smaller than this go out uncompressed; it isn't worth the CPU.
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+# Rows coming out of the storage layer are already valid tasks. In fast mode they
+# are encoded as-is instead of being rebuilt into a Task model per row first.
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "0") == "1"
+
+_plain = TypeAdapter(Any)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _plain.dump_json(obj)
+
+
+def encode_page(items: list[dict], next_cursor: Optional[str]) -> bytes:
+    if FAST_RESPONSES:
+        return dumps({"items": items, "next_cursor": next_cursor})
+    return TaskPage(items=items, next_cursor=next_cursor).model_dump_json().encode()
+
+
+def _accepted(header: Optional[str]) -> dict[str, float]:
+    accepted = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack when the client prefers it (and it's installed), JSON otherwise."""
+    if msgpack is None or not accept:
+        return JSON
+    accepted = _accepted(accept)
+    packed = max(accepted.get(MSGPACK, 0), accepted.get("application/x-msgpack", 0))
+    plain = max(accepted.get(JSON, 0), accepted.get("application/*", 0), accepted.get("*/*", 0))
+    return MSGPACK if packed > 0 and packed > plain else JSON
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    accepted = _accepted(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+
+class Representations:
+    """One response body in each format and content encoding asked for so far.
+
+    Built from a JSON body, or from the data behind it plus the function that
+    turns it into JSON; other variants are derived on first request and kept,
+    so a cached page is packed and compressed once rather than on every hit.
+    With an ``etag``, each variant gets its own tag derived from it.
+    """
+
+    __slots__ = ("etag", "_json", "_data", "_to_json", "_variants")
+
+    def __init__(self, json_body: Optional[bytes] = None, etag: Optional[str] = None, data: Any = None, to_json=dumps):
+        self.etag = etag
+        self._json = json_body
+        self._data = data
+        self._to_json = to_json
+        self._variants: dict[tuple[str, Optional[str]], tuple[bytes, Optional[str], Optional[str]]] = {}
+
+    def _encode(self, media_type: str) -> bytes:
+        if media_type == MSGPACK:
+            data = self._data if self._data is not None else json.loads(self._json)
+            return msgpack.packb(data)
+        if self._json is None:
+            self._json = self._to_json(self._data)
+        return self._json
+
+    def etag_for(self, media_type: str, encoding: Optional[str]) -> Optional[str]:
+        """The variant's tag, known without encoding or compressing anything.
+
+        It names the encoding negotiated, whether or not the body turns out big
+        enough to compress, so a conditional request can be answered first.
+        """
+        if self.etag is None:
+            return None
+        return variant_etag(self.etag, media_type == MSGPACK, encoding)
+
+    def get(self, media_type: str, encoding: Optional[str]) -> tuple[bytes, Optional[str], Optional[str]]:
+        """(body, etag, content encoding actually applied) for this variant."""
+        key = (media_type, encoding)
+        variant = self._variants.get(key)
+        if variant is None:
+            body = self._encode(media_type)
+            applied = encoding if encoding and len(body) >= COMPRESS_MIN_SIZE else None
+            if applied:
+                body = compress(body, applied)
+            variant = self._variants[key] = (body, self.etag_for(media_type, encoding), applied)
+        return variant
+
+
+class CompressionMiddleware:
+    """Compresses the remaining buffered responses of ``COMPRESS_MIN_SIZE`` or more.
+
+    Bodies built through Representations arrive already encoded (and their
+    compressed variants cached), so anything with a Content-Encoding passes
+    through, as do responses with an ETag, whose tag would no longer match
+    the bytes, and streamed ones (exports, the event feed).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept_encoding = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"accept-encoding"), None
+        )
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                names = {name.lower() for name, _ in message.get("headers", [])}
+                if names & {b"content-encoding", b"etag"}:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            head, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < COMPRESS_MIN_SIZE:
+                await send(head)
+                await send(message)
+                return
+            body = compress(body, encoding)
+            headers = [(name, value) for name, value in head.get("headers", []) if name.lower() != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**head, "headers": headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
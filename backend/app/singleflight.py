@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one in-flight call.
+
+    The first caller for a key starts the call; anyone asking for the same key
+    before it finishes awaits that call instead of starting their own.
+    ``forget`` detaches matching in-flight calls so callers that arrive after a
+    write start a fresh query rather than joining one that began before it.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self.forgotten = 0
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # Strong references: the loop only keeps weak ones, and a forgotten call
+        # whose callers have all gone away could otherwise be collected mid-query.
+        self._running: set[asyncio.Task] = set()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            # Run as its own task so one caller giving up (a client disconnect)
+            # doesn't cancel the query for everyone else waiting on it.
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone away
+
+    def forget(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._inflight if predicate(key)]:
+            del self._inflight[key]
+            self.forgotten += 1
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "forgotten": self.forgotten,
+        }
+
+
+task_reads = SingleFlight()
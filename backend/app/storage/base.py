@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import AsyncIterator, Optional, Sequence
+
+
+class TaskStore(ABC):
+    """Storage backend behind app.crud. Rows are returned as plain dicts.
+
+    Deletes are soft: the row is kept as a tombstone and every other read skips it.
+    Reads that take ``columns`` only fetch those columns (all of them when None).
+    """
+
+    @abstractmethod
+    async def get_tasks(
+        self, limit: int, before_id: Optional[int] = None, status: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[dict]:
+        ...
+
+    @abstractmethod
+    async def get_task(self, task_id: int, columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_tasks_by_ids(self, task_ids: list[int], columns: Optional[Sequence[str]] = None) -> list[dict]:
+        """The live rows among ``task_ids``, in one query and in no particular order."""
+
+    @abstractmethod
+    async def create_task(self, data: dict) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def update_task(self, task_id: int, data: dict, version: Optional[int] = None) -> Optional[dict]:
+        """Apply ``data`` and bump the row's version; with ``version``, only if it still matches.
+
+        None when no live row with that id (and version) exists.
+        """
+
+    @abstractmethod
+    async def delete_task(self, task_id: int, version: Optional[int] = None) -> Optional[dict]:
+        """Tombstone the row, with the same ``version`` check as update_task."""
+
+    @abstractmethod
+    async def create_tasks(self, rows: list[dict]) -> list[dict]:
+        """Insert all rows at once, returning them in input order."""
+
+    @abstractmethod
+    async def import_tasks(self, rows: list[dict]) -> int:
+        """Bulk-load one chunk of rows in its own transaction without returning them; the number loaded."""
+
+    @abstractmethod
+    async def update_tasks(self, updates: list[tuple[int, dict]]) -> list[dict]:
+        """Apply per-id partial updates at once, returning the rows that exist."""
+
+    @abstractmethod
+    async def delete_tasks(self, task_ids: list[int]) -> list[dict]:
+        """Delete all ids at once, returning the rows that existed."""
+
+    @abstractmethod
+    def stream_tasks(self, chunk_size: int) -> AsyncIterator[list[dict]]:
+        """Yield every task in id order, ``chunk_size`` rows at a time."""
+
+    @abstractmethod
+    async def get_changes(self, since: int, limit: int) -> list[dict]:
+        """Rows (tombstones included) with change_version > since, oldest change first.
+
+        Each row also carries ``change_version`` and a ``deleted`` flag. Rows
+        sharing a version (one transaction's writes) all come back together,
+        even past ``limit``, and no version a still-running write could take is
+        skipped over.
+        """
+
+    @abstractmethod
+    async def purge_tombstones(self, older_than: timedelta) -> int:
+        """Hard-delete tombstones older than ``older_than``; the number removed.
+
+        Records the highest change_version removed for get_purged_version.
+        """
+
+    @abstractmethod
+    async def get_purged_version(self) -> int:
+        """The highest change_version of any purged tombstone (0 if none)."""
+
+    @abstractmethod
+    async def search_tasks(self, query: str, limit: int, offset: int) -> list[dict]:
+        """Full-text search over title and description, best match first."""
+
+    @abstractmethod
+    async def get_status_counts(self) -> dict[str, int]:
+        """Live task count per status, read from the trigger-maintained counts table."""
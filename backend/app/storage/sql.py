@@ -0,0 +1,248 @@
+import enum
+from datetime import timedelta
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Integer, Interval, select, insert, update, delete, any_, bindparam, case, literal, literal_column, func, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models import Task, TaskStatusCount, TaskTombstonePurge
+from app.storage.base import TaskStore
+
+COLUMNS = (Task.id, Task.title, Task.description, Task.status, Task.version)
+IMPORT_COLUMNS = ("title", "description", "status")
+# Deleted rows stay behind as tombstones for delta sync.
+LIVE = Task.deleted_at.is_(None)
+
+
+def _matching(task_id: int, version: Optional[int]) -> tuple:
+    if version is None:
+        return (Task.id == task_id, LIVE)
+    return (Task.id == task_id, Task.version == version, LIVE)
+
+
+def _columns(names: Optional[Sequence[str]]) -> tuple:
+    if names is None:
+        return COLUMNS
+    return tuple(Task.__table__.c[name] for name in names)
+
+
+def _to_dict(row) -> dict:
+    data = dict(row._mapping)
+    if isinstance(data.get("status"), enum.Enum):
+        data["status"] = data["status"].value
+    return data
+
+
+def _first(result) -> Optional[dict]:
+    row = result.first()
+    return _to_dict(row) if row else None
+
+
+class SQLAlchemyTaskStore(TaskStore):
+    """Native async store on the SQLAlchemy engine (asyncpg, or aiosqlite locally)."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def get_tasks(
+        self, limit: int, before_id: Optional[int] = None, status: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[dict]:
+        stmt = select(*_columns(columns)).where(LIVE).order_by(Task.id.desc()).limit(limit)
+        if before_id is not None:
+            stmt = stmt.where(Task.id < before_id)
+        if status is not None:
+            stmt = stmt.where(Task.status == status)
+        async with self.engine.connect() as conn:
+            result = await conn.execute(stmt)
+            return [_to_dict(row) for row in result]
+
+    async def get_task(self, task_id: int, columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(select(*_columns(columns)).where(Task.id == task_id, LIVE))
+            return _first(result)
+
+    async def get_tasks_by_ids(self, task_ids: list[int], columns: Optional[Sequence[str]] = None) -> list[dict]:
+        if self.engine.dialect.name == "postgresql":
+            # One array parameter: the statement text is the same for any number
+            # of ids, so asyncpg reuses one prepared statement for all of them.
+            matching = Task.id == any_(bindparam("ids", task_ids, type_=ARRAY(Integer)))
+        else:
+            matching = Task.id.in_(task_ids)
+        async with self.engine.connect() as conn:
+            result = await conn.execute(select(*_columns(columns)).where(matching, LIVE))
+            return [_to_dict(row) for row in result]
+
+    async def create_task(self, data: dict) -> Optional[dict]:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(insert(Task).values(**data).returning(*COLUMNS))
+            return _first(result)
+
+    async def update_task(self, task_id: int, data: dict, version: Optional[int] = None) -> Optional[dict]:
+        # The version check and the write are one statement, so there is no window
+        # between reading the version and writing for another writer to slip into.
+        stmt = (
+            update(Task)
+            .where(*_matching(task_id, version))
+            .values(**data, version=Task.version + 1)
+            .returning(*COLUMNS)
+        )
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+            return _first(result)
+
+    async def delete_task(self, task_id: int, version: Optional[int] = None) -> Optional[dict]:
+        stmt = (
+            update(Task)
+            .where(*_matching(task_id, version))
+            .values(deleted_at=func.now(), version=Task.version + 1)
+            .returning(*COLUMNS)
+        )
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+            return _first(result)
+
+    async def create_tasks(self, rows: list[dict]) -> list[dict]:
+        # insertmanyvalues turns this into a multi-row INSERT ... RETURNING
+        stmt = insert(Task).returning(*COLUMNS, sort_by_parameter_order=True)
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt, rows)
+            return [_to_dict(row) for row in result]
+
+    async def import_tasks(self, rows: list[dict]) -> int:
+        async with self.engine.connect() as conn:
+            if self.engine.dialect.name != "postgresql":
+                await conn.execute(insert(Task), rows)  # executemany, nothing returned
+                await conn.commit()
+                return len(rows)
+            # COPY through asyncpg directly: the binary protocol without a
+            # statement per row. The trigger gives every row the transaction's
+            # change version, and each chunk commits on its own, so no lock
+            # outlives it.
+            raw = (await conn.get_raw_connection()).driver_connection
+            async with raw.transaction():
+                await raw.copy_records_to_table(
+                    "tasks", columns=IMPORT_COLUMNS,
+                    records=[tuple(row[name] for name in IMPORT_COLUMNS) for row in rows],
+                )
+        return len(rows)
+
+    async def update_tasks(self, updates: list[tuple[int, dict]]) -> list[dict]:
+        # One UPDATE for every row: each column becomes CASE id WHEN ... ELSE column,
+        # which also works for rows that set different fields.
+        values = {}
+        for name in {name for _, data in updates for name in data}:
+            column = Task.__table__.c[name]
+            whens = {
+                task_id: literal(data[name], column.type)
+                for task_id, data in updates if name in data
+            }
+            values[name] = case(whens, value=Task.id, else_=column)
+        stmt = (
+            update(Task)
+            .where(Task.id.in_([task_id for task_id, _ in updates]), LIVE)
+            .values(**values, version=Task.version + 1)
+            .returning(*COLUMNS)
+        )
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+            return [_to_dict(row) for row in result]
+
+    async def delete_tasks(self, task_ids: list[int]) -> list[dict]:
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(task_ids), LIVE)
+            .values(deleted_at=func.now(), version=Task.version + 1)
+            .returning(*COLUMNS)
+        )
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+            return [_to_dict(row) for row in result]
+
+    async def stream_tasks(self, chunk_size: int) -> AsyncIterator[list[dict]]:
+        # Server-side cursor: only one chunk of rows is held in memory at a time.
+        stmt = select(*COLUMNS).where(LIVE).order_by(Task.id).execution_options(yield_per=chunk_size)
+        async with self.engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.partitions():
+                yield [_to_dict(row) for row in rows]
+
+    async def get_changes(self, since: int, limit: int) -> list[dict]:
+        if self.engine.dialect.name == "postgresql":
+            # Versions are transaction ids there; the function pages by whole
+            # transaction and stops below the xmin horizon (migration 88612a7ae672).
+            stmt = text(
+                "SELECT id, title, description, status, version, change_version, deleted_at IS NOT NULL AS deleted "
+                "FROM tasks_changed_since(:since, :limit)"
+            )
+            params = {"since": since, "limit": limit}
+        else:
+            # SQLite's single writer takes versions from a counter, one per row, in commit order.
+            stmt = (
+                select(*COLUMNS, Task.change_version, Task.deleted_at.is_not(None).label("deleted"))
+                .where(Task.change_version > since)
+                .order_by(Task.change_version)
+                .limit(limit)
+            )
+            params = {}
+        async with self.engine.connect() as conn:
+            result = await conn.execute(stmt, params)
+            return [_to_dict(row) for row in result]
+
+    async def purge_tombstones(self, older_than: timedelta) -> int:
+        async with self.engine.begin() as conn:
+            if self.engine.dialect.name == "postgresql":
+                purge = func.tasks_purge_tombstones(bindparam("older_than", older_than, type_=Interval))
+                return await conn.scalar(select(purge))
+            cutoff = func.datetime("now", f"-{int(older_than.total_seconds())} seconds")
+            result = await conn.execute(
+                delete(Task).where(Task.deleted_at < cutoff).returning(Task.change_version)
+            )
+            versions = result.scalars().all()
+            if versions:
+                await conn.execute(
+                    update(TaskTombstonePurge)
+                    .where(TaskTombstonePurge.id == 1)
+                    .values(version=func.max(TaskTombstonePurge.version, max(versions)))
+                )
+            return len(versions)
+
+    async def get_purged_version(self) -> int:
+        async with self.engine.connect() as conn:
+            return await conn.scalar(select(TaskTombstonePurge.version).where(TaskTombstonePurge.id == 1))
+
+    async def search_tasks(self, query: str, limit: int, offset: int) -> list[dict]:
+        if self.engine.dialect.name == "sqlite":
+            return await self._search_fts5(query, limit, offset)
+        # search_vector is a generated tsvector column with a GIN index (migration 80e84537693d).
+        tsquery = func.websearch_to_tsquery(text("'english'"), query)
+        search_vector = literal_column("search_vector")
+        stmt = (
+            select(*COLUMNS)
+            .where(search_vector.op("@@")(tsquery), LIVE)
+            .order_by(func.ts_rank(search_vector, tsquery).desc(), Task.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        async with self.engine.connect() as conn:
+            result = await conn.execute(stmt)
+            return [_to_dict(row) for row in result]
+
+    async def _search_fts5(self, query: str, limit: int, offset: int) -> list[dict]:
+        # Quote every term so user input can't hit FTS5 query syntax; terms are ANDed.
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        stmt = text(
+            "SELECT tasks.id, tasks.title, tasks.description, tasks.status, tasks.version FROM tasks_fts "
+            "JOIN tasks ON tasks.id = tasks_fts.rowid "
+            "WHERE tasks_fts MATCH :match AND tasks.deleted_at IS NULL "
+            "ORDER BY bm25(tasks_fts, 2.0, 1.0), tasks.id DESC LIMIT :limit OFFSET :offset"
+        )
+        async with self.engine.connect() as conn:
+            result = await conn.execute(stmt, {"match": match, "limit": limit, "offset": offset})
+            return [_to_dict(row) for row in result]
+
+    async def get_status_counts(self) -> dict[str, int]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(select(TaskStatusCount.status, TaskStatusCount.count))
+            return {status.value: count for status, count in result}
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, Sequence
+
+from supabase import Client
+
+from app.storage.base import TaskStore
+
+COLUMNS = ("id", "title", "description", "status", "version")
+
+
+def _row(data: dict) -> dict:
+    return {name: data[name] for name in COLUMNS if name in data}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SupabaseTaskStore(TaskStore):
+    """Store on the Supabase REST client.
+
+    The client is synchronous, so every ``execute()`` runs in a worker thread
+    instead of blocking the event loop for the whole round trip.
+    """
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    def _select(self, columns: Optional[Sequence[str]] = None):
+        return self.client.table("tasks").select(",".join(columns or COLUMNS)).is_("deleted_at", "null")
+
+    async def _execute(self, query) -> list[dict]:
+        response = await asyncio.to_thread(query.execute)
+        return [_row(data) for data in response.data]
+
+    async def _first(self, query) -> Optional[dict]:
+        rows = await self._execute(query)
+        return rows[0] if rows else None
+
+    async def get_tasks(
+        self, limit: int, before_id: Optional[int] = None, status: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[dict]:
+        query = self._select(columns).order("id", desc=True).limit(limit)
+        if before_id is not None:
+            query = query.lt("id", before_id)
+        if status is not None:
+            query = query.eq("status", status)
+        return await self._execute(query)
+
+    async def get_task(self, task_id: int, columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        return await self._first(self._select(columns).eq("id", task_id))
+
+    async def get_tasks_by_ids(self, task_ids: list[int], columns: Optional[Sequence[str]] = None) -> list[dict]:
+        return await self._execute(self._select(columns).in_("id", task_ids))
+
+    async def create_task(self, data: dict) -> Optional[dict]:
+        return await self._first(self.client.table("tasks").insert(data))
+
+    async def update_task(self, task_id: int, data: dict, version: Optional[int] = None) -> Optional[dict]:
+        # The tasks_version trigger bumps the version; the filter makes the write conditional.
+        query = self.client.table("tasks").update(data).eq("id", task_id).is_("deleted_at", "null")
+        if version is not None:
+            query = query.eq("version", version)
+        return await self._first(query)
+
+    async def delete_task(self, task_id: int, version: Optional[int] = None) -> Optional[dict]:
+        return await self.update_task(task_id, {"deleted_at": _now()}, version)
+
+    async def create_tasks(self, rows: list[dict]) -> list[dict]:
+        return await self._execute(self.client.table("tasks").insert(rows))
+
+    async def import_tasks(self, rows: list[dict]) -> int:
+        query = self.client.table("tasks").insert(rows, returning="minimal")
+        await asyncio.to_thread(query.execute)
+        return len(rows)
+
+    async def update_tasks(self, updates: list[tuple[int, dict]]) -> list[dict]:
+        # PostgREST has no multi-row partial update, so this is one request per row,
+        # all issued from the same worker thread.
+        def run():
+            rows = []
+            for task_id, data in updates:
+                query = self.client.table("tasks").update(data).eq("id", task_id).is_("deleted_at", "null")
+                rows.extend(_row(row) for row in query.execute().data)
+            return rows
+        return await asyncio.to_thread(run)
+
+    async def delete_tasks(self, task_ids: list[int]) -> list[dict]:
+        query = (
+            self.client.table("tasks")
+            .update({"deleted_at": _now()})
+            .in_("id", task_ids)
+            .is_("deleted_at", "null")
+        )
+        return await self._execute(query)
+
+    async def stream_tasks(self, chunk_size: int) -> AsyncIterator[list[dict]]:
+        # No cursors over REST; walk the primary key in keyset pages instead.
+        last_id = 0
+        while True:
+            rows = await self._execute(self._select().gt("id", last_id).order("id").limit(chunk_size))
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1]["id"]
+
+    async def get_changes(self, since: int, limit: int) -> list[dict]:
+        # The same database function the SQL store uses: whole transactions, below the xmin horizon.
+        query = self.client.rpc("tasks_changed_since", {"since": since, "max_rows": limit})
+        response = await asyncio.to_thread(query.execute)
+        return [
+            {**_row(data), "change_version": data["change_version"], "deleted": data["deleted_at"] is not None}
+            for data in response.data
+        ]
+
+    async def purge_tombstones(self, older_than: timedelta) -> int:
+        query = self.client.rpc("tasks_purge_tombstones", {"older_than": f"{int(older_than.total_seconds())} seconds"})
+        response = await asyncio.to_thread(query.execute)
+        return response.data
+
+    async def get_purged_version(self) -> int:
+        query = self.client.table("task_tombstone_purges").select("version").eq("id", 1)
+        response = await asyncio.to_thread(query.execute)
+        return response.data[0]["version"]
+
+    async def search_tasks(self, query: str, limit: int, offset: int) -> list[dict]:
+        # PostgREST can filter on the tsvector but not order by ts_rank, so newest first.
+        search = (
+            self._select()
+            .text_search("search_vector", query, options={"type": "websearch", "config": "english"})
+            .order("id", desc=True)
+            .range(offset, offset + limit - 1)
+        )
+        return await self._execute(search)
+
+    async def get_status_counts(self) -> dict[str, int]:
+        response = await asyncio.to_thread(self.client.table("task_status_counts").select("*").execute)
+        return {row["status"]: row["count"] for row in response.data}
@@ -0,0 +1,182 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# A deliberately small Prometheus text-format implementation: observing a value
+# is a dict lookup and a bisect, with no locks (everything runs on the event loop).
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, _labels(self.labels, labels), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels) -> None:
+        self.values[labels] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self):
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield self.name + "_bucket", _labels(self.labels, labels, f'le="{le}"'), cumulative
+            yield self.name + "_sum", _labels(self.labels, labels), total
+            yield self.name + "_count", _labels(self.labels, labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route, method and status code.",
+    ("route", "method", "status"),
+))
+http_request_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body.",
+    ("route", "method"),
+))
+
+
+class InFlight:
+    """Gauge of requests being handled, grouped by route when scraped.
+
+    The route is only known once routing has run, so the middleware just keeps
+    the live scopes and the grouping is paid for at scrape time, not per request.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.scopes: dict[int, dict] = {}
+
+    def samples(self):
+        counts: dict[tuple, int] = {}
+        for scope in self.scopes.values():
+            labels = (_route(scope), scope["method"])
+            counts[labels] = counts.get(labels, 0) + 1
+        for labels, count in counts.items():
+            yield self.name, _labels(("route", "method"), labels), count
+
+
+http_in_flight = registry.register(InFlight(
+    "http_requests_in_flight", "Requests currently being handled.",
+))
+store_seconds = registry.register(Histogram(
+    "task_store_duration_seconds",
+    "Time spent per crud operation, split into the database round trip and serialization.",
+    ("operation", "phase"),
+))
+
+
+def _route(scope) -> str:
+    # Label by route template (/tasks/{task_id}), never the raw path, so the
+    # number of series stays bounded.
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware, so streaming responses are timed to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.scopes[id(scope)] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            del http_in_flight.scopes[id(scope)]
+            route = _route(scope)
+            http_request_seconds.observe(elapsed, route, scope["method"])
+            http_requests.inc(route, scope["method"], status)
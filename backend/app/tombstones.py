@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Deleted tasks stay behind as tombstones so delta sync can report them; after
+# this many days they are removed (0 keeps them forever).
+TASK_TOMBSTONE_RETENTION_DAYS = float(os.getenv("TASK_TOMBSTONE_RETENTION_DAYS", "30"))
+# Seconds between purges in each worker.
+TASK_TOMBSTONE_PURGE_INTERVAL = float(os.getenv("TASK_TOMBSTONE_PURGE_INTERVAL", "3600"))
+
+
+class ChangesPurged(Exception):
+    """A delta sync started before tombstones it would have reported were purged."""
+
+    def __init__(self, purged_version: int):
+        super().__init__("Deletions after this version were purged; sync again from since=0")
+        self.purged_version = purged_version
+
+
+class TombstonePurger:
+    """Periodically hard-deletes tombstones older than the retention period.
+
+    ``purge`` gets the retention period and returns how many rows went. Every
+    worker runs one; purges are idempotent, so overlapping ones just find
+    nothing left to do.
+    """
+
+    def __init__(self, purge: Callable[[timedelta], Awaitable[int]]):
+        self.purge = purge
+        self.runs = 0
+        self.purged = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return TASK_TOMBSTONE_RETENTION_DAYS > 0
+
+    def start(self) -> None:
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        retention = timedelta(days=TASK_TOMBSTONE_RETENTION_DAYS)
+        while True:
+            try:
+                self.purged += await self.purge(retention)
+                self.runs += 1
+            except Exception as exc:
+                logger.warning("tombstone purge failed: %s", exc)
+                self.failures += 1
+            await asyncio.sleep(TASK_TOMBSTONE_PURGE_INTERVAL)
+
+    def stats(self) -> dict:
+        return {
+            "retention_days": TASK_TOMBSTONE_RETENTION_DAYS,
+            "runs": self.runs,
+            "purged": self.purged,
+            "failures": self.failures,
+        }
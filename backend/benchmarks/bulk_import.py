@@ -0,0 +1,107 @@
+"""Stream a large NDJSON or CSV file into POST /tasks/import and watch server memory.
+
+Starts the API under uvicorn against ``DATABASE_URL`` (a throwaway SQLite file
+when it is unset) and uploads ``--rows`` generated tasks as a streamed body,
+so neither side ever holds the whole file. Every ``--bad-every``-th row is
+invalid. Reports rows per second and the server's peak resident memory before
+and after; the growth should stay flat as ``--rows`` goes up.
+
+    python -m benchmarks.bulk_import --rows 100000 --format csv
+    DATABASE_URL=postgresql://... python -m benchmarks.bulk_import --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+import httpx
+
+from app.database import init_db
+from benchmarks.load import _free_port, start_server
+
+
+def _peak_rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def body(rows: int, format: str, bad_every: int):
+    # Sent in batches of lines so the upload isn't bottlenecked on tiny writes.
+    batch = []
+    if format == "csv":
+        batch.append("title,description,status\n")
+    for i in range(rows):
+        title = "" if bad_every and i % bad_every == 0 else f"Imported task {i}"
+        status = "done" if i % 3 == 0 else "pending"
+        if format == "csv":
+            batch.append(f'{title},"Imported, row {i}",{status}\n')
+        else:
+            batch.append(json.dumps({"title": title, "description": f"Imported row {i}", "status": status}) + "\n")
+        if len(batch) >= 1000:
+            yield "".join(batch).encode()
+            batch = []
+    if batch:
+        yield "".join(batch).encode()
+
+
+async def upload(base_url: str, rows: int, format: str, bad_every: int) -> tuple[dict, float]:
+    content_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        started = time.perf_counter()
+        response = await client.post(
+            "/tasks/import", content=body(rows, format, bad_every), headers={"Content-Type": content_type},
+        )
+        elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    return response.json(), elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--bad-every", type=int, default=1000, help="make every Nth row invalid (0: none)")
+    args = parser.parse_args()
+
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        asyncio.run(init_db())
+    port = _free_port()
+    server = start_server(port, 1)
+    try:
+        before = _peak_rss_kb(server.pid)
+        summary, elapsed = asyncio.run(upload(f"http://127.0.0.1:{port}", args.rows, args.format, args.bad_every))
+        after = _peak_rss_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    expected_bad = len(range(0, args.rows, args.bad_every)) if args.bad_every else 0
+    report = {
+        "backend": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "format": args.format,
+        "rows": args.rows,
+        "imported": summary["imported"],
+        "failed": summary["failed"],
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round(args.rows / elapsed),
+        "server_peak_rss_mb": {"before": round(before / 1024, 1), "after": round(after / 1024, 1)},
+    }
+    print(json.dumps(report, indent=2))
+    if summary["failed"] != expected_bad or summary["imported"] != args.rows - expected_bad:
+        print(f"FAIL: expected {args.rows - expected_bad} imported and {expected_bad} failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Check that parallel requests overlap on the event loop instead of serializing.
+
+Runs N concurrent ``GET /tasks`` requests, each with a different page size so
+neither single-flight coalescing nor the lookup batcher folds them together
+(single-task lookups are merged into one query by design), through the ASGI app against
+the configured store (a throwaway SQLite file by default) and records how many
+storage calls were in flight at the same time. A blocking store never gets
+above one; the run fails unless the peak reaches ``--min-overlap``.
+
+    python -m benchmarks.concurrency --requests 50
+    DATABASE_URL=postgresql://... python -m benchmarks.concurrency
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+import httpx
+
+from app.database import get_store, init_db
+from app.main import app
+from app.pagination import MAX_PAGE_SIZE
+from app.schemas import TaskCreate
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def wrap(self, func):
+        async def wrapper(*args, **kwargs):
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.current -= 1
+        return wrapper
+
+
+async def run(requests: int) -> tuple[int, float]:
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        await init_db()
+    store = get_store()
+    created = await store.create_tasks(
+        [TaskCreate(title=f"concurrency probe {i}").dict() for i in range(requests)]
+    )
+
+    in_flight = InFlight()
+    store.get_tasks = in_flight.wrap(store.get_tasks)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/tasks", params={"limit": 1 + i % MAX_PAGE_SIZE}) for i in range(requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    await store.delete_tasks([task["id"] for task in created])
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise SystemExit(f"{len(failed)} requests failed: {failed[:5]}")
+    return in_flight.peak, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--min-overlap", type=int, default=2)
+    args = parser.parse_args()
+
+    peak, elapsed = asyncio.run(run(args.requests))
+    print(f"requests={args.requests} peak_in_flight={peak} elapsed={elapsed * 1000:.1f}ms")
+    if peak < args.min_overlap:
+        print(f"FAIL: storage calls serialized (peak {peak} < {args.min_overlap})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
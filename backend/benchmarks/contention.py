@@ -0,0 +1,105 @@
+"""Measure optimistic concurrency under many writers per row.
+
+Every writer repeatedly increments a counter kept in its task's description:
+read the task, then write back count + 1. ``--mode if-match`` sends the ETag
+from the read as If-Match and retries on 412; ``--mode blind`` writes
+unconditionally, which is what the API did before task versions. Reports
+writes and surviving increments per second, 412s, and lost updates
+(increments overwritten by another writer), which must be zero for if-match.
+
+    python -m benchmarks.contention --rows 4 --writers 8 --increments 10
+    python -m benchmarks.contention --mode blind
+    DATABASE_URL=postgresql://... python -m benchmarks.contention
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+import httpx
+
+from app.database import get_store, init_db
+from app.main import app
+from app.schemas import TaskCreate
+
+
+def _count(task: dict) -> int:
+    return int(task["description"].split()[-1])
+
+
+async def writer(client: httpx.AsyncClient, task_id: int, increments: int, conditional: bool, stats: dict):
+    done = 0
+    while done < increments:
+        read = await client.get(f"/tasks/{task_id}")
+        task = read.json()
+        headers = {"If-Match": read.headers["ETag"]} if conditional else {}
+        response = await client.post(
+            f"/tasks/{task_id}", json={"description": f"count {_count(task) + 1}"}, headers=headers,
+        )
+        if response.status_code == 412:
+            stats["conflicts"] += 1
+            continue
+        response.raise_for_status()
+        done += 1
+
+
+async def run(rows: int, writers: int, increments: int, mode: str) -> dict:
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        await init_db()
+    store = get_store()
+    created = await store.create_tasks(
+        [TaskCreate(title=f"contention probe {i}", description="count 0").dict() for i in range(rows)]
+    )
+    stats = {"conflicts": 0}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            writer(client, task["id"], increments, mode == "if-match", stats)
+            for task in created for _ in range(writers)
+        ))
+        elapsed = time.perf_counter() - started
+        final = [_count((await client.get(f"/tasks/{task['id']}")).json()) for task in created]
+
+    await store.delete_tasks([task["id"] for task in created])
+    committed = rows * writers * increments
+    return {
+        "mode": mode,
+        "rows": rows,
+        "writers_per_row": writers,
+        "increments_per_writer": increments,
+        "elapsed_s": round(elapsed, 3),
+        "writes_per_s": round(committed / elapsed, 1),
+        # Increments that survived; blind writes overwrite each other's.
+        "effective_per_s": round(sum(final) / elapsed, 1),
+        "conflicts": stats["conflicts"],
+        "lost_updates": committed - sum(final),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=8, help="concurrent writers per row")
+    parser.add_argument("--increments", type=int, default=10, help="successful writes per writer")
+    parser.add_argument("--mode", choices=["if-match", "blind"], default="if-match")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.rows, args.writers, args.increments, args.mode))
+    print(json.dumps(report, indent=2))
+    if args.mode == "if-match" and report["lost_updates"]:
+        print(f"FAIL: {report['lost_updates']} updates lost despite If-Match")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Fail when the cold-start import of the app regresses.
+
+Imports ``app.main`` in fresh interpreters under ``python -X importtime`` and
+compares the median cumulative time with a bare ``import fastapi`` measured in
+the same run, alternating the two so both see the same machine. The budget in
+``import_budget.json`` is a ratio between them, so it holds on a fast laptop
+and a slow CI runner alike. It also fails if any module on the forbidden list
+gets imported eagerly, since the database engine and Supabase client are meant
+to be built on first use.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 7 --max-ratio 1.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "import_budget.json")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    env = {**os.environ, "DATABASE_URL": os.getenv("DATABASE_URL", "sqlite+aiosqlite:///unused.db")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative_us = None
+    imported = set()
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"{module} did not show up in -X importtime output")
+    return cumulative_us / 1000, imported
+
+
+def main() -> int:
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ratio", type=float, default=budget["max_ratio"])
+    args = parser.parse_args()
+
+    module, baseline_module = budget["module"], budget["baseline_module"]
+    timings, baseline_timings = [], []
+    imported: set[str] = set()
+    for _ in range(args.runs):
+        elapsed, imported = measure(module)
+        timings.append(elapsed)
+        baseline_timings.append(measure(baseline_module)[0])
+    median = statistics.median(timings)
+    baseline = statistics.median(baseline_timings)
+    ratio = median / baseline
+    forbidden = sorted(
+        name for name in imported
+        if any(name == f or name.startswith(f + ".") for f in budget["forbidden_modules"])
+    )
+
+    print(json.dumps({
+        "module": module,
+        "median_ms": round(median, 1),
+        "baseline_module": baseline_module,
+        "baseline_median_ms": round(baseline, 1),
+        "ratio": round(ratio, 2),
+        "max_ratio": args.max_ratio,
+        "runs_ms": [round(t, 1) for t in timings],
+        "forbidden_imported": forbidden,
+    }, indent=2))
+    failed = False
+    if ratio > args.max_ratio:
+        print(
+            f"FAIL: importing {module} took {median:.0f}ms, {ratio:.2f}x {baseline_module} "
+            f"({baseline:.0f}ms); budget is {args.max_ratio}x"
+        )
+        failed = True
+    if forbidden:
+        print(f"FAIL: eagerly imported {', '.join(forbidden[:5])}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Check that one worker's writes evict another worker's cache within milliseconds.
+
+Starts two API servers against the same Postgres ``DATABASE_URL``, both with a
+long-lived cache. Each round warms worker B's cache for a task and the first
+list page, writes through worker A (an update, then a create), and polls B until
+it serves the new data. Reports how long that took; without the LISTEN/NOTIFY
+listener B would keep serving the cached copies for the whole TTL.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.invalidation --rounds 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+if not os.getenv("DATABASE_URL", "").startswith(("postgresql", "postgres://")):
+    raise SystemExit("needs DATABASE_URL pointing at a Postgres migrated to head")
+
+os.environ.setdefault("TASK_CACHE_SIZE", "10000")
+os.environ.setdefault("TASK_CACHE_TTL", "600")
+
+import httpx
+
+from benchmarks.load import _free_port, _percentile, start_server
+
+
+async def until(check, timeout: float) -> float | None:
+    """Seconds until ``check()`` is true, or None if it never was within ``timeout``."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if await check():
+            return time.perf_counter() - started
+        await asyncio.sleep(0.001)
+    return None
+
+
+async def run(a: str, b: str, rounds: int, timeout: float) -> dict:
+    lags = {"update": [], "create": []}
+    stale = 0
+    async with httpx.AsyncClient(base_url=a) as writer, httpx.AsyncClient(base_url=b) as reader:
+        task = (await writer.post("/tasks", json={"title": "invalidation probe"})).json()
+        # Give B's listener a moment to connect before its cache is relied on.
+        await until(lambda: _connected(reader), 10)
+        for i in range(rounds):
+            await reader.get(f"/tasks/{task['id']}")
+            await reader.get("/tasks", params={"limit": 5})
+
+            title = f"invalidation probe {i}"
+            await writer.post(f"/tasks/{task['id']}", json={"title": title})
+            lag = await until(lambda: _title_is(reader, task["id"], title), timeout)
+            if lag is None:
+                stale += 1
+            else:
+                lags["update"].append(lag)
+
+            created = (await writer.post("/tasks", json={"title": f"created {i}"})).json()
+            lag = await until(lambda: _first_id_is(reader, created["id"]), timeout)
+            if lag is None:
+                stale += 1
+            else:
+                lags["create"].append(lag)
+            await writer.delete(f"/tasks/{created['id']}")
+        await writer.delete(f"/tasks/{task['id']}")
+        stats = (await reader.get("/stats")).json()
+
+    return {
+        "rounds": rounds,
+        "stale": stale,
+        **{
+            name: {
+                "p50_ms": round(_percentile(sorted(values), 50) * 1000, 2),
+                "p95_ms": round(_percentile(sorted(values), 95) * 1000, 2),
+                "max_ms": round(max(values) * 1000, 2),
+            }
+            for name, values in lags.items() if values
+        },
+        "reader_cache": {"hits": stats["cache"]["hits"], "misses": stats["cache"]["misses"]},
+        "reader_invalidation": stats.get("invalidation"),
+    }
+
+
+async def _connected(client: httpx.AsyncClient) -> bool:
+    return (await client.get("/stats")).json().get("invalidation", {}).get("connected", False)
+
+
+async def _title_is(client: httpx.AsyncClient, task_id: int, title: str) -> bool:
+    return (await client.get(f"/tasks/{task_id}")).json()["title"] == title
+
+
+async def _first_id_is(client: httpx.AsyncClient, task_id: int) -> bool:
+    items = (await client.get("/tasks", params={"limit": 5})).json()["items"]
+    return bool(items) and items[0]["id"] == task_id
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds a stale read may persist")
+    args = parser.parse_args()
+
+    servers = []
+    try:
+        ports = []
+        for _ in range(2):
+            ports.append(_free_port())
+            servers.append(start_server(ports[-1], 1))
+        a, b = (f"http://127.0.0.1:{port}" for port in ports)
+        report = asyncio.run(run(a, b, args.rounds, args.timeout))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(10)
+
+    print(json.dumps(report, indent=2))
+    if report["stale"]:
+        print(f"FAIL: {report['stale']} writes still not visible on the other worker after {args.timeout}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""Drive a mixed read/write workload at the task API and gate on a baseline.
+
+Starts ``app.main:app`` under uvicorn against ``DATABASE_URL`` (a throwaway
+SQLite file when it is unset), seeds it up to ``--rows`` synthetic tasks, then
+runs ``--concurrency`` clients for ``--duration`` seconds. Each client picks
+operations from a weighted mix covering every route in ``routers/tasks.py``,
+from a fixed random seed so runs are repeatable. The JSON report holds
+throughput and p50/p95/p99 latency overall and per operation.
+
+With ``--baseline`` the run fails when throughput drops, or p95 latency rises,
+by more than ``--tolerance`` against the stored report, overall or for any
+operation with at least ``--min-samples`` requests. Baselines are only
+comparable on the same machine and settings, so none is checked in: record one
+with ``--save-baseline`` where the check runs, and a baseline from another host,
+CPU count or configuration is refused rather than compared.
+
+    python -m benchmarks.load --rows 10000 --concurrency 16 --duration 20
+    python -m benchmarks.load --save-baseline load_baseline.json
+    python -m benchmarks.load --baseline load_baseline.json
+    DATABASE_URL=postgresql://... python -m benchmarks.load --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+import httpx
+
+from app.database import get_engine, get_store, init_db
+
+SEED_CHUNK = 5000
+WORDS = (
+    "alpha", "billing", "deploy", "review", "urgent", "report", "design", "client",
+    "invoice", "backend", "frontend", "meeting", "research", "refactor", "release",
+)
+
+# name -> weight. Reads dominate, as they do in the app.
+MIX = {
+    "list": 20,
+    "list_status": 8,
+    "list_fields": 5,
+    "list_since": 4,
+    "get": 20,
+    "get_fields": 4,
+    "get_many": 3,
+    "stats": 6,
+    "search": 6,
+    "export": 1,
+    "events": 1,
+    "create": 8,
+    "update": 6,
+    "update_if_match": 2,
+    "delete": 2,
+    "batch_create": 2,
+    "batch_update": 2,
+    "batch_delete": 1,
+}
+
+
+def _title(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}"
+
+
+def _row(rng: random.Random, i: int) -> dict:
+    return {
+        "title": _title(rng, i),
+        "description": " ".join(rng.choice(WORDS) for _ in range(12)),
+        "status": "done" if rng.random() < 0.3 else "pending",
+    }
+
+
+async def seed(rows: int, rng: random.Random) -> int:
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        await init_db()
+    store = get_store()
+    existing = sum((await store.get_status_counts()).values())
+    for start in range(existing, rows, SEED_CHUNK):
+        count = min(SEED_CHUNK, rows - start)
+        await store.create_tasks([_row(rng, start + i) for i in range(count)])
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+    return max(rows - existing, 0)
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, ids: list[int]):
+        self.client = client
+        self.rng = rng
+        self.ids = ids
+        self.created = 0
+
+    def _id(self) -> int:
+        return self.rng.choice(self.ids)
+
+    def _take_id(self) -> int:
+        # Deleting takes the id out of the pool so later picks don't 404.
+        index = self.rng.randrange(len(self.ids))
+        self.ids[index], self.ids[-1] = self.ids[-1], self.ids[index]
+        return self.ids.pop()
+
+    def _new(self) -> dict:
+        self.created += 1
+        return _row(self.rng, 10_000_000 + self.created)
+
+    async def list(self):
+        return await self.client.get("/tasks", params={"limit": 50})
+
+    async def list_status(self):
+        return await self.client.get("/tasks", params={"limit": 50, "status": self.rng.choice(["pending", "done"])})
+
+    async def list_fields(self):
+        return await self.client.get("/tasks", params={"limit": 200, "fields": "id,title"})
+
+    async def list_since(self):
+        return await self.client.get("/tasks", params={"since": 0, "limit": 100})
+
+    async def get(self):
+        return await self.client.get(f"/tasks/{self._id()}")
+
+    async def get_fields(self):
+        return await self.client.get(f"/tasks/{self._id()}", params={"fields": "title,status"})
+
+    async def get_many(self):
+        ids = ",".join(str(self._id()) for _ in range(self.rng.randint(2, 10)))
+        return await self.client.get("/tasks", params={"ids": ids})
+
+    async def stats(self):
+        return await self.client.get("/tasks/stats")
+
+    async def search(self):
+        return await self.client.get("/tasks/search", params={"q": self.rng.choice(WORDS), "limit": 20})
+
+    async def export(self):
+        # Only the first chunk: a full export of a large table would dominate the run.
+        async with self.client.stream("GET", "/tasks/export") as response:
+            async for _ in response.aiter_bytes():
+                break
+        return response
+
+    async def events(self):
+        # Time to an open stream; SSE connections otherwise never finish.
+        async with self.client.stream("GET", "/tasks/events") as response:
+            return response
+
+    async def create(self):
+        response = await self.client.post("/tasks", json=self._new())
+        if response.status_code == 201:
+            self.ids.append(response.json()["id"])
+        return response
+
+    async def update(self):
+        return await self.client.post(f"/tasks/{self._id()}", json={"status": self.rng.choice(["pending", "done"])})
+
+    async def update_if_match(self):
+        task_id = self._id()
+        current = await self.client.get(f"/tasks/{task_id}")
+        if current.status_code != 200:
+            return current
+        return await self.client.post(
+            f"/tasks/{task_id}", json={"title": self._new()["title"]},
+            headers={"If-Match": current.headers["ETag"]},
+        )
+
+    async def delete(self):
+        return await self.client.delete(f"/tasks/{self._take_id()}")
+
+    async def batch_create(self):
+        response = await self.client.post("/tasks/batch", json=[self._new() for _ in range(20)])
+        if response.status_code == 201:
+            self.ids.extend(result["id"] for result in response.json())
+        return response
+
+    async def batch_update(self):
+        updates = [{"id": self._id(), "status": self.rng.choice(["pending", "done"])} for _ in range(20)]
+        # Duplicate ids are rejected, so keep the first of each.
+        unique = list({update["id"]: update for update in reversed(updates)}.values())
+        return await self.client.patch("/tasks/batch", json=unique)
+
+    async def batch_delete(self):
+        ids = [self._take_id() for _ in range(min(10, len(self.ids) - 1))]
+        return await self.client.request("DELETE", "/tasks/batch", json={"ids": ids})
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+    }
+
+
+async def drive(base_url: str, concurrency: int, duration: float, seed_value: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        ids = []
+        cursor = None
+        while len(ids) < 5000:
+            params = {"limit": 200, "fields": "id"} | ({"cursor": cursor} if cursor else {})
+            page = (await client.get("/tasks", params=params)).json()
+            ids.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        if not ids:
+            raise SystemExit("no tasks to work with; seed with --rows")
+
+        names = list(MIX)
+        weights = [MIX[name] for name in names]
+        latencies: dict[str, list[float]] = {name: [] for name in names}
+        errors: dict[str, int] = {name: 0 for name in names}
+
+        async def client_loop(worker: int, deadline: float):
+            workload = Workload(client, random.Random(seed_value + worker), ids)
+            while time.perf_counter() < deadline:
+                name = workload.rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await getattr(workload, name)()
+                    failed = response.status_code >= 500
+                except httpx.HTTPError:
+                    failed = True
+                latencies[name].append(time.perf_counter() - started)
+                errors[name] += failed
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(client_loop(worker, deadline) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    everything = [latency for values in latencies.values() for latency in values]
+    return {
+        "total": summarize(everything, sum(errors.values()), elapsed),
+        "operations": {
+            name: summarize(latencies[name], errors[name], elapsed) for name in names if latencies[name]
+        },
+    }
+
+
+# Settings a baseline has to share with the run for the numbers to be comparable.
+COMPARABLE = ("backend", "rows", "concurrency", "duration_s", "workers", "seed", "host", "cpus")
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_samples: int) -> list[str]:
+    mismatched = [
+        f"{key}={baseline['config'].get(key)!r} (now {report['config'][key]!r})"
+        for key in COMPARABLE if baseline["config"].get(key) != report["config"][key]
+    ]
+    if mismatched:
+        return ["baseline was recorded elsewhere or with other settings: " + ", ".join(mismatched)]
+    failures = []
+    pairs = [("total", report["total"], baseline["total"])]
+    # Rare operations have too few samples for their p95 to mean much.
+    pairs += [
+        (name, stats, baseline["operations"][name])
+        for name, stats in report["operations"].items()
+        if name in baseline.get("operations", {})
+        and min(stats["requests"], baseline["operations"][name]["requests"]) >= min_samples
+    ]
+    for name, current, previous in pairs:
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            failures.append(f"{name}: throughput {current['throughput_rps']} rps < baseline {previous['throughput_rps']} rps")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {current['p95_ms']}ms > baseline {previous['p95_ms']}ms")
+    if report["total"]["errors"]:
+        failures.append(f"{report['total']['errors']} requests failed with a 5xx or transport error")
+    return failures
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"server exited with {server.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("server did not start within 30s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", help="fail when worse than this report")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed regression, as a fraction")
+    parser.add_argument("--min-samples", type=int, default=200, help="skip operations with fewer requests")
+    parser.add_argument("--save-baseline", help="write the report here")
+    parser.add_argument("--output", help="also write the report here")
+    args = parser.parse_args()
+
+    seeded = asyncio.run(seed(args.rows, random.Random(args.seed)))
+    port = _free_port()
+    server = start_server(port, args.workers)
+    try:
+        results = asyncio.run(drive(f"http://127.0.0.1:{port}", args.concurrency, args.duration, args.seed))
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    report = {
+        "config": {
+            "backend": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "rows": args.rows,
+            "seeded": seeded,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "workers": args.workers,
+            "seed": args.seed,
+            "host": platform.node(),
+            "cpus": os.cpu_count(),
+        },
+        **results,
+    }
+    print(json.dumps(report, indent=2))
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(report, json.load(f), args.tolerance, args.min_samples)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1 if failures else 0
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Compare response encoding paths for a list page at 1k, 10k and 100k rows.
+
+- fastapi: what returning dicts with ``response_model`` costs (validate every row
+  into a model, dump to JSON-able Python, ``json.dumps``)
+- model_dump_json: validate into ``TaskPage`` and let pydantic-core write the JSON
+- fast: the FAST_RESPONSES path, encoding the trusted rows directly
+
+Then, for the wire formats the API negotiates, the bytes sent and the CPU time
+spent producing them: JSON and MessagePack, each uncompressed, gzip and brotli.
+
+    python -m benchmarks.serialization --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import sys
+import time
+
+from pydantic import TypeAdapter
+
+from app.schemas import TaskPage
+from app.serialization import brotli, compress, dumps, msgpack, orjson
+
+_page = TypeAdapter(TaskPage)
+
+
+def make_rows(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Task number {i}",
+            "description": "Some description text that is moderately long " * 4,
+            "status": "done" if i % 3 == 0 else "pending",
+            "version": 1,
+        }
+        for i in range(n, 0, -1)
+    ]
+
+
+def via_fastapi(rows: list[dict]) -> bytes:
+    page = _page.validate_python({"items": rows, "next_cursor": None})
+    content = _page.dump_python(page, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def via_model_dump_json(rows: list[dict]) -> bytes:
+    return TaskPage(items=rows, next_cursor=None).model_dump_json().encode()
+
+
+def via_fast(rows: list[dict]) -> bytes:
+    return dumps({"items": rows, "next_cursor": None})
+
+
+PATHS = {"fastapi": via_fastapi, "model_dump_json": via_model_dump_json, "fast": via_fast}
+
+
+def best_of(func, rows: list[dict], repeat: int, clock=time.perf_counter) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = clock()
+        func(rows)
+        timings.append(clock() - started)
+    return min(timings)
+
+
+def wire_formats() -> dict:
+    encoders = {"json": via_fast}
+    if msgpack is not None:
+        encoders["msgpack"] = lambda rows: msgpack.packb({"items": rows, "next_cursor": None})
+    encodings = [None, "gzip"] + (["br"] if brotli is not None else [])
+    formats = {}
+    for name, encode in encoders.items():
+        for encoding in encodings:
+            label = f"{name}+{encoding}" if encoding else name
+            formats[label] = (
+                (lambda rows, encode=encode, encoding=encoding: compress(encode(rows), encoding))
+                if encoding else encode
+            )
+    return formats
+
+
+def measure_wire(rows: list[dict], repeat: int) -> dict:
+    return {
+        label: {
+            "bytes": len(encode(rows)),
+            "cpu_ms": round(best_of(encode, rows, repeat, time.process_time) * 1000, 2),
+        }
+        for label, encode in wire_formats().items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    wire = []
+    for size in args.sizes:
+        rows = make_rows(size)
+        if json.loads(via_fast(rows)) != json.loads(via_fastapi(rows)):
+            print(f"FAIL: fast path output differs at {size} rows")
+            return 1
+        timings = {name: best_of(func, rows, args.repeat) for name, func in PATHS.items()}
+        results.append({
+            "rows": size,
+            **{f"{name}_ms": round(t * 1000, 2) for name, t in timings.items()},
+            "speedup": round(timings["fastapi"] / timings["fast"], 1),
+        })
+        wire.append({"rows": size, "formats": measure_wire(rows, args.repeat)})
+    print(json.dumps({"encoder": "orjson" if orjson else "pydantic-core", "results": results, "wire": wire}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+# Set before the app is imported: the suite runs against a throwaway SQLite file.
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'tasks.db')}"
+
+import httpx
+import pytest
+
+from app.database import get_engine, init_db
+from app.main import app
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # Pooled aiosqlite connections belong to this test's event loop.
+    await get_engine().dispose()
+
+
+@pytest.fixture
+def create(client):
+    async def create(title: str, **fields) -> dict:
+        response = await client.post("/tasks", json={"title": title, **fields})
+        assert response.status_code == 201
+        return response.json()
+    return create
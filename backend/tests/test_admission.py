@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app import admission
+from app.admission import AdmissionLimiter, Overloaded
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_full_queue_is_shed():
+    limiter = AdmissionLimiter("test", limit=1, queue_size=1, queue_timeout=1)
+    await limiter.acquire()
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as shed:
+        await limiter.acquire()
+    assert shed.value.reason == "queue_full"
+
+    limiter.release()
+    await waiting
+    assert limiter.stats()["in_flight"] == 1
+    assert limiter.stats()["shed"] == {"queue_full": 1, "queue_timeout": 0}
+
+
+async def test_waiter_times_out_and_leaves_the_queue():
+    limiter = AdmissionLimiter("test", limit=1, queue_size=5, queue_timeout=0.01)
+    await limiter.acquire()
+
+    with pytest.raises(Overloaded) as shed:
+        await limiter.acquire()
+
+    assert shed.value.reason == "queue_timeout"
+    assert limiter.stats()["queued"] == 0
+
+
+async def test_slot_goes_to_the_oldest_waiter():
+    limiter = AdmissionLimiter("test", limit=1, queue_size=5, queue_timeout=1)
+    await limiter.acquire()
+    order = []
+
+    async def enter(name):
+        await limiter.acquire()
+        order.append(name)
+
+    waiters = [asyncio.ensure_future(enter(name)) for name in ("first", "second")]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*waiters)
+
+    assert order == ["first", "second"]
+
+
+async def test_middleware_answers_503_with_retry_after(client, monkeypatch):
+    limiter = AdmissionLimiter("write", limit=1, queue_size=0, queue_timeout=1)
+    monkeypatch.setattr(admission, "write_admission", limiter)
+    await limiter.acquire()
+
+    response = await client.post("/tasks", json={"title": "shed"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(admission.ADMISSION_RETRY_AFTER)
+    assert response.json()["reason"] == "queue_full"
+    # Reads have their own limiter, which is off here.
+    assert (await client.get("/tasks")).status_code == 200
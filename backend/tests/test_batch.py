@@ -0,0 +1,60 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_returns_results_in_input_order(client):
+    response = await client.post("/tasks/batch", json=[{"title": f"batch {i}"} for i in range(5)])
+
+    assert response.status_code == 201
+    results = response.json()
+    assert [r["index"] for r in results] == list(range(5))
+    assert [r["task"]["title"] for r in results] == [f"batch {i}" for i in range(5)]
+    assert {r["status"] for r in results} == {"created"}
+
+
+async def test_update_reports_each_item(client, create):
+    first, second = await create("first"), await create("second")
+
+    response = await client.patch("/tasks/batch", json=[
+        {"id": second["id"], "status": "done"},
+        {"id": 10**9, "title": "nobody"},
+        {"id": first["id"]},
+        {"id": first["id"] + 10**9, "status": "done"},
+        {"id": 2 * 10**9},
+    ])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [(r["index"], r["status"]) for r in results] == [
+        (0, "updated"), (1, "not_found"), (2, "unchanged"), (3, "not_found"), (4, "not_found"),
+    ]
+    assert results[0]["task"]["status"] == "done"
+    assert results[2]["task"] == first
+
+
+async def test_update_rejects_null_title_and_status(client, create):
+    task = await create("not null")
+
+    for field in ("title", "status"):
+        response = await client.patch("/tasks/batch", json=[{"id": task["id"], field: None}])
+        assert response.status_code == 422
+
+
+async def test_update_rejects_duplicate_ids(client, create):
+    task = await create("twice")
+
+    response = await client.patch("/tasks/batch", json=[{"id": task["id"], "status": "done"}] * 2)
+
+    assert response.status_code == 400
+
+
+async def test_delete_reports_repeated_id_once(client, create):
+    task = await create("delete me")
+
+    response = await client.request("DELETE", "/tasks/batch", json={"ids": [task["id"], 10**9, task["id"]]})
+
+    assert response.status_code == 200
+    assert [(r["id"], r["status"]) for r in response.json()] == [
+        (task["id"], "deleted"), (10**9, "not_found"), (task["id"], "not_found"),
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.batching import WriteBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+def _batcher(flush_many, flush_one=None) -> WriteBatcher:
+    async def one(row):
+        return (await flush_many([row]))[0]
+    return WriteBatcher(flush_many, flush_one or one, window=0.005, max_batch=10)
+
+
+async def test_concurrent_submissions_become_one_batch():
+    batches = []
+
+    async def flush_many(rows):
+        batches.append(rows)
+        return [row * 10 for row in rows]
+
+    batcher = _batcher(flush_many)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+async def test_max_batch_splits_submissions():
+    batches = []
+
+    async def flush_many(rows):
+        batches.append(len(rows))
+        return rows
+
+    batcher = _batcher(flush_many)
+    await asyncio.gather(*(batcher.submit(i) for i in range(25)))
+
+    assert sum(batches) == 25
+    assert max(batches) <= 10
+
+
+async def test_failed_batch_falls_back_to_one_write_per_row():
+    async def flush_many(rows):
+        raise ValueError("batch rejected")
+
+    async def flush_one(row):
+        if row == "bad":
+            raise ValueError("bad row")
+        return row.upper()
+
+    batcher = _batcher(flush_many, flush_one)
+    results = await asyncio.gather(
+        batcher.submit("a"), batcher.submit("bad"), batcher.submit("b"), return_exceptions=True,
+    )
+
+    assert results[0] == "A" and results[2] == "B"
+    assert isinstance(results[1], ValueError) and str(results[1]) == "bad row"
+    assert batcher.stats()["fallbacks"] == 1
+
+
+async def test_short_result_list_fails_every_caller_without_retrying():
+    retried = []
+
+    async def flush_many(rows):
+        return rows[:-1]
+
+    async def flush_one(row):
+        retried.append(row)
+        return row
+
+    batcher = _batcher(flush_many, flush_one)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == []
@@ -0,0 +1,87 @@
+import pytest
+
+from app import cache
+from app.cache import TTLCache, task_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    c = TTLCache(maxsize=10, ttl=30)
+    c.set("a", 1)
+
+    clock.now += 29
+    assert c.get("a") == 1
+    clock.now += 1
+    assert c.get("a") is None
+    assert c.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    c = TTLCache(maxsize=2, ttl=30)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert (c.get("a"), c.get("c")) == (1, 3)
+    assert c.stats()["evictions"] == 1
+
+
+def test_value_loaded_before_an_invalidation_is_not_cached(clock):
+    c = TTLCache(maxsize=10, ttl=30)
+    generation = c.generation
+    c.invalidate(lambda key: True)
+
+    c.set("a", "stale", generation)
+
+    assert c.get("a") is None
+
+
+def test_zero_size_disables_the_cache():
+    c = TTLCache(maxsize=0, ttl=30)
+    c.set("a", 1)
+
+    assert c.get("a") is None
+    assert not c.stats()["enabled"]
+
+
+@pytest.fixture
+def enabled_cache(monkeypatch):
+    monkeypatch.setattr(task_cache, "maxsize", 100)
+    task_cache.clear()
+    yield task_cache
+    task_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_writes_replace_cached_task_and_drop_cached_pages(client, create, enabled_cache):
+    task = await create("cached")
+    await client.get(f"/tasks/{task['id']}")
+    await client.get("/tasks")
+    hits = enabled_cache.hits
+
+    assert (await client.get(f"/tasks/{task['id']}")).json()["title"] == "cached"
+    assert enabled_cache.hits == hits + 1
+
+    await client.post(f"/tasks/{task['id']}", json={"title": "renamed"})
+    assert (await client.get(f"/tasks/{task['id']}")).json()["title"] == "renamed"
+    assert "renamed" in [item["title"] for item in (await client.get("/tasks")).json()["items"]]
+
+    await client.delete(f"/tasks/{task['id']}")
+    assert (await client.get(f"/tasks/{task['id']}")).status_code == 404
+    assert task["id"] not in [item["id"] for item in (await client.get("/tasks")).json()["items"]]
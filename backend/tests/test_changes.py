@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.database import get_engine, get_store
+
+pytestmark = pytest.mark.anyio
+
+
+async def _head(client) -> int:
+    params = {"since": 0, "limit": 200}
+    while True:
+        body = (await client.get("/tasks", params=params)).json()
+        if not body["has_more"]:
+            return body["version"]
+        params["cursor"] = body["next_cursor"]
+
+
+async def test_delta_reports_changes_and_deletions(client, create):
+    since = await _head(client)
+    kept, gone = await create("kept"), await create("gone")
+    await client.delete(f"/tasks/{gone['id']}")
+
+    body = (await client.get("/tasks", params={"since": since})).json()
+
+    assert [task["id"] for task in body["items"]] == [kept["id"]]
+    assert body["deleted"] == [gone["id"]]
+    assert body["version"] > since
+    assert (await client.get("/tasks", params={"since": body["version"]})).json()["items"] == []
+
+
+async def test_full_sync_pages_follow_the_cursor(client, create):
+    for i in range(5):
+        await create(f"page {i}")
+
+    first = (await client.get("/tasks", params={"since": 0, "limit": 2})).json()
+    second = (await client.get("/tasks", params={"since": 0, "limit": 2, "cursor": first["next_cursor"]})).json()
+
+    assert first["has_more"] and len(first["items"]) + len(first["deleted"]) == 2
+    assert {task["id"] for task in first["items"]}.isdisjoint(task["id"] for task in second["items"])
+    assert (await client.get("/tasks", params={"since": 1, "cursor": first["next_cursor"]})).status_code == 400
+
+
+async def test_sync_from_before_purged_tombstones_is_410(client, create):
+    # A client that last synced after this task was created.
+    await create("synced")
+    since = await _head(client)
+    task = await create("purged")
+    await client.delete(f"/tasks/{task['id']}")
+    async with get_engine().begin() as conn:
+        await conn.execute(
+            text("UPDATE tasks SET deleted_at = datetime('now', '-40 days') WHERE id = :id"), {"id": task["id"]}
+        )
+
+    assert await get_store().purge_tombstones(timedelta(days=30)) == 1
+
+    assert (await client.get("/tasks", params={"since": since})).status_code == 410
+    assert (await client.get("/tasks", params={"since": await _head(client)})).status_code == 200
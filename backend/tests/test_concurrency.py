@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from app.database import get_store
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_requests_overlap_on_the_event_loop(client, create, monkeypatch):
+    await create("overlap")
+    store = get_store()
+    get_tasks = store.get_tasks
+    in_flight, peak = 0, 0
+
+    async def tracked(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await get_tasks(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(store, "get_tasks", tracked)
+    # Different page sizes, so no two requests share one coalesced read.
+    responses = await asyncio.gather(*(client.get("/tasks", params={"limit": n}) for n in range(1, 21)))
+
+    assert [r.status_code for r in responses] == [200] * 20
+    assert peak > 1
+
@@ -0,0 +1,58 @@
+import pytest
+
+from app.conditional import if_match_version
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_update_with_current_etag_applies(client, create):
+    task = await create("conditional")
+    etag = (await client.get(f"/tasks/{task['id']}")).headers["ETag"]
+
+    response = await client.post(f"/tasks/{task['id']}", json={"status": "done"}, headers={"If-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_stale_etag_is_412_with_current_etag(client, create):
+    task = await create("conditional")
+    stale = (await client.get(f"/tasks/{task['id']}")).headers["ETag"]
+    await client.post(f"/tasks/{task['id']}", json={"status": "done"})
+    current = (await client.get(f"/tasks/{task['id']}")).headers["ETag"]
+
+    for method, kwargs in (("POST", {"json": {"title": "lost"}}), ("DELETE", {})):
+        response = await client.request(method, f"/tasks/{task['id']}", headers={"If-Match": stale}, **kwargs)
+        assert response.status_code == 412
+        # The 412 names the current version; the read's tag may name a variant of it.
+        assert if_match_version(response.headers["ETag"]) == if_match_version(current)
+    assert (await client.get(f"/tasks/{task['id']}")).json()["title"] == "conditional"
+
+
+@pytest.mark.parametrize("if_match", ['"1"', "*"])
+async def test_missing_task_with_if_match_is_412(client, if_match):
+    for method, kwargs in (("POST", {"json": {"title": "ghost"}}), ("DELETE", {})):
+        response = await client.request(method, f"/tasks/{10**9}", headers={"If-Match": if_match}, **kwargs)
+        assert response.status_code == 412
+
+
+async def test_missing_task_without_if_match_is_404(client):
+    response = await client.delete(f"/tasks/{10**9}")
+
+    assert response.status_code == 404
+
+
+
+async def test_empty_update_answers_with_the_task_as_it_stands(client, create):
+    task = await create("untouched")
+    etag = (await client.get(f"/tasks/{task['id']}")).headers["ETag"]
+
+    response = await client.post(f"/tasks/{task['id']}", json={}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == task
+    assert (await client.post(f"/tasks/{task['id']}", json={})).status_code == 200
+
+    await client.post(f"/tasks/{task['id']}", json={"status": "done"})
+    assert (await client.post(f"/tasks/{task['id']}", json={}, headers={"If-Match": etag})).status_code == 412
+    assert (await client.post(f"/tasks/{10**9}", json={})).status_code == 404
+    assert (await client.post(f"/tasks/{10**9}", json={}, headers={"If-Match": "*"})).status_code == 412
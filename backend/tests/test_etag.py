@@ -0,0 +1,40 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _vary(response) -> set[str]:
+    return {name.strip() for name in response.headers.get("Vary", "").split(",")}
+
+
+async def test_task_304_repeats_the_200_headers(client, create):
+    task = await create("cached")
+    first = await client.get(f"/tasks/{task['id']}")
+
+    again = await client.get(f"/tasks/{task['id']}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert again.status_code == 304
+    assert again.content == b""
+    for name in ("ETag", "Cache-Control"):
+        assert again.headers[name] == first.headers[name]
+    assert {"Accept", "Accept-Encoding"} <= _vary(again)
+
+
+async def test_write_changes_the_tag(client, create):
+    task = await create("cached")
+    etag = (await client.get(f"/tasks/{task['id']}")).headers["ETag"]
+    await client.post(f"/tasks/{task['id']}", json={"status": "done"})
+
+    response = await client.get(f"/tasks/{task['id']}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_page_304_until_a_write(client, create):
+    await create("listed")
+    etag = (await client.get("/tasks")).headers["ETag"]
+
+    assert (await client.get("/tasks", headers={"If-None-Match": etag})).status_code == 304
+    await create("another")
+    assert (await client.get("/tasks", headers={"If-None-Match": etag})).status_code == 200
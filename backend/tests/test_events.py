@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.events import EventBroker
+
+pytestmark = pytest.mark.anyio
+
+
+async def _take(stream, n: int) -> list:
+    return [await asyncio.wait_for(anext(stream), 1) for _ in range(n)]
+
+
+async def _subscribed(broker: EventBroker, last_event_id=None):
+    stream = broker.listen(last_event_id)
+    # Start the generator so it is subscribed before anything is published.
+    first = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    return stream, first
+
+
+async def test_live_events_carry_the_epoch():
+    broker = EventBroker(queue_size=10, history=10)
+    stream, first = await _subscribed(broker)
+
+    broker.publish("created", {"id": 1})
+
+    assert await first == (f"{broker.epoch}-1", "created", '{"id": 1}')
+    await stream.aclose()
+
+
+async def test_resume_replays_only_missed_events():
+    broker = EventBroker(queue_size=10, history=10)
+    for i in range(1, 4):
+        broker.publish("updated", {"id": i})
+
+    stream = broker.listen(f"{broker.epoch}-1")
+
+    assert [event[0] for event in await _take(stream, 2)] == [f"{broker.epoch}-2", f"{broker.epoch}-3"]
+    await stream.aclose()
+
+
+@pytest.mark.parametrize("last_event_id", ["other-2", "2", "garbage", "{epoch}-1", "{epoch}-99"])
+async def test_unresumable_ids_get_a_reset(last_event_id):
+    # History keeps ids 3-5; 1 fell out of it and 99 was never issued.
+    broker = EventBroker(queue_size=10, history=3)
+    for i in range(1, 6):
+        broker.publish("updated", {"id": i})
+
+    stream = broker.listen(last_event_id.format(epoch=broker.epoch))
+
+    assert await _take(stream, 1) == [(f"{broker.epoch}-5", "reset", "{}")]
+    await stream.aclose()
+
+
+async def test_resume_from_the_oldest_kept_boundary():
+    broker = EventBroker(queue_size=10, history=3)
+    for i in range(1, 6):
+        broker.publish("updated", {"id": i})
+
+    stream = broker.listen(f"{broker.epoch}-2")
+
+    assert [event[1] for event in await _take(stream, 3)] == ["updated"] * 3
+    await stream.aclose()
+
+
+async def test_slow_subscriber_is_dropped():
+    broker = EventBroker(queue_size=2, history=10)
+    stream, first = await _subscribed(broker)
+
+    for i in range(4):
+        broker.publish("created", {"id": i})
+
+    with pytest.raises(StopAsyncIteration):
+        await first
+    assert broker.stats()["dropped"] == 1
+    assert broker.stats()["subscribers"] == 0
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.importer import ImportSummary, validated_chunks
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ndjson_summary_lists_bad_lines(client):
+    body = "\n".join([
+        json.dumps({"title": "imported one"}),
+        "{not json",
+        json.dumps({"title": ""}),
+        "[1, 2]",
+        "",
+        json.dumps({"title": "imported two", "status": "done"}),
+    ])
+
+    response = await client.post("/tasks/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["imported"] == 2
+    assert summary["failed"] == 3
+    assert [error["line"] for error in summary["errors"]] == [2, 3, 4]
+    assert summary["errors"][0]["error"].startswith("Invalid JSON")
+    assert summary["errors"][2]["error"] == "Expected a JSON object"
+    assert summary["errors_truncated"] is False
+
+
+async def test_csv_summary_counts_quoted_newlines_as_one_record(client):
+    body = 'id,title,description,status\n1,first,"two\nlines",done\n2,,empty title,pending\n3,third,,bogus\n'
+
+    response = await client.post("/tasks/import", params={"format": "csv"}, content=body)
+
+    summary = response.json()
+    assert summary["imported"] == 1
+    assert [error["line"] for error in summary["errors"]] == [4, 5]
+
+
+async def test_errors_past_the_cap_are_only_counted():
+    async def body():
+        yield b"\n".join(json.dumps({"title": ""}).encode() for _ in range(5))
+
+    summary = ImportSummary(max_errors=2)
+    chunks = [chunk async for chunk in validated_chunks(body(), "ndjson", summary)]
+
+    assert chunks == []
+    assert summary.result() == {
+        "imported": 0,
+        "failed": 5,
+        "errors": summary.errors,
+        "errors_truncated": True,
+    }
+    assert [error["line"] for error in summary.errors] == [1, 2]
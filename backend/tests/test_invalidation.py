@@ -0,0 +1,47 @@
+import logging
+import time
+
+from app import invalidation
+from app.invalidation import ChangeListener, can_listen
+
+URL = "postgresql://postgres@db:6543/postgres"
+
+
+def test_listens_on_postgres_only(monkeypatch):
+    monkeypatch.setattr(invalidation, "_LISTEN_THROUGH_POOLER", False)
+
+    assert can_listen(URL)
+    assert not can_listen("sqlite+aiosqlite:///tasks.db")
+    assert not can_listen(None)
+
+
+def test_pooler_without_listen_url_warns_and_stays_off(monkeypatch, caplog):
+    monkeypatch.setattr(invalidation, "_LISTEN_THROUGH_POOLER", True)
+
+    with caplog.at_level(logging.WARNING, logger="app.invalidation"):
+        assert not can_listen(URL)
+
+    assert "TASK_CACHE_LISTEN_URL" in caplog.text
+
+
+def test_notifications_name_rows_and_skip_own_writes():
+    changes = []
+    listener = ChangeListener(changes.append)
+    listener._own_pids.add(1)
+
+    listener._notified(None, 1, invalidation.CHANNEL, f"{time.time()} 5")
+    listener._notified(None, 2, invalidation.CHANNEL, f"{time.time()} 5,6")
+    listener._notified(None, 2, invalidation.CHANNEL, f"{time.time()} ")
+
+    assert changes == [{5, 6}, None]
+    assert listener.stats()["ignored_own"] == 1
+
+
+def test_malformed_notification_evicts_everything():
+    changes = []
+    listener = ChangeListener(changes.append)
+
+    listener._notified(None, 2, invalidation.CHANNEL, "garbage 1,x")
+
+    assert changes == [None]
+    assert listener.stats()["malformed"] == 1
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.database import get_store
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_items_follow_requested_order_and_missing_ids_are_listed(client, create):
+    a, b, c = await create("a"), await create("b"), await create("c")
+    gone = await create("gone")
+    await client.delete(f"/tasks/{gone['id']}")
+    ids = [c["id"], 10**9, a["id"], gone["id"], b["id"]]
+
+    response = await client.get("/tasks", params={"ids": ",".join(map(str, ids))})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [task["id"] for task in body["items"]] == [c["id"], a["id"], b["id"]]
+    assert body["missing"] == [10**9, gone["id"]]
+
+
+async def test_fields_are_projected(client, create):
+    task = await create("projected", description="hidden")
+
+    response = await client.get("/tasks", params={"ids": str(task["id"]), "fields": "title"})
+
+    assert response.json()["items"] == [{"id": task["id"], "title": "projected"}]
+
+
+@pytest.mark.parametrize("ids", ["", "1,x", ",".join(str(i) for i in range(1, 202))])
+async def test_bad_ids_are_400(client, ids):
+    response = await client.get("/tasks", params={"ids": ids})
+
+    assert response.status_code == 400
+
+
+async def test_concurrent_lookups_share_one_query(client, create, monkeypatch):
+    tasks = [await create(f"lookup {i}") for i in range(10)]
+    store = get_store()
+    get_tasks_by_ids = store.get_tasks_by_ids
+    calls = []
+
+    async def counted(task_ids):
+        calls.append(task_ids)
+        return await get_tasks_by_ids(task_ids)
+
+    monkeypatch.setattr(store, "get_tasks_by_ids", counted)
+    responses = await asyncio.gather(*(client.get(f"/tasks/{task['id']}") for task in tasks))
+
+    assert [r.json()["id"] for r in responses] == [task["id"] for task in tasks]
+    assert len(calls) < len(tasks)
@@ -0,0 +1,160 @@
+import gzip
+
+import httpx
+import msgpack
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+
+from app import crud
+from app.conditional import if_match_version
+from app.routers import tasks as tasks_router
+from app.serialization import COMPRESS_MIN_SIZE, CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+MSGPACK = {"Accept": "application/msgpack", "Accept-Encoding": "br"}
+
+
+def _vary(response: httpx.Response) -> set[str]:
+    return {name.strip() for name in response.headers.get("Vary", "").split(",")}
+
+
+@pytest.fixture
+def fast_responses(monkeypatch):
+    monkeypatch.setattr(crud, "FAST_RESPONSES", True)
+    monkeypatch.setattr(tasks_router, "FAST_RESPONSES", True)
+
+
+async def test_msgpack_read_tag_is_accepted_by_if_match(client, create):
+    task = await create("packed")
+
+    response = await client.get(f"/tasks/{task['id']}", headers=MSGPACK)
+    assert response.headers["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content)["title"] == "packed"
+    etag = response.headers["ETag"]
+    assert etag == f'"{task["version"]}-mp-br"'
+
+    updated = await client.post(f"/tasks/{task['id']}", json={"status": "done"}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+    stale = await client.post(f"/tasks/{task['id']}", json={"status": "pending"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+
+
+async def test_fast_response_tags_are_accepted_by_if_match(client, create, fast_responses):
+    task = await create("fast")
+    etag = (await client.get(f"/tasks/{task['id']}", headers={"Accept-Encoding": "gzip"})).headers["ETag"]
+    assert etag == f'"{task["version"]}-gzip"'
+
+    response = await client.post(f"/tasks/{task['id']}", json={"status": "done"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+
+    stale = await client.delete(f"/tasks/{task['id']}", headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert if_match_version(stale.headers["ETag"]) == task["version"] + 1
+
+
+async def test_projected_read_tag_is_accepted_by_if_match(client, create):
+    task = await create("projected")
+
+    response = await client.get(f"/tasks/{task['id']}", params={"fields": "title"})
+    assert response.json() == {"id": task["id"], "title": "projected"}
+
+    updated = await client.post(
+        f"/tasks/{task['id']}", json={"status": "done"}, headers={"If-Match": response.headers["ETag"]}
+    )
+    assert updated.status_code == 200
+
+
+@pytest.fixture
+async def big_page(create):
+    for i in range(30):
+        await create(f"compressible {i}", description="x" * 100)
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+async def test_pages_are_compressed_per_accept_encoding(client, big_page, encoding):
+    response = await client.get("/tasks", params={"limit": 30}, headers={"Accept-Encoding": encoding})
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert {"Accept", "Accept-Encoding"} <= _vary(response)
+    assert response.headers["ETag"].endswith(f'-{encoding}"')
+    assert len(response.json()["items"]) == 30
+
+
+async def test_uncompressed_when_no_encoding_is_accepted(client, big_page):
+    response = await client.get("/tasks", params={"limit": 30}, headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in response.headers
+    assert not response.headers["ETag"].endswith(('-br"', '-gzip"'))
+
+
+async def test_if_none_match_compares_the_negotiated_variant(client, big_page):
+    params = {"limit": 30}
+    packed = await client.get("/tasks", params=params, headers=MSGPACK)
+    etag = packed.headers["ETag"]
+
+    again = await client.get("/tasks", params=params, headers={**MSGPACK, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert {"Accept", "Accept-Encoding"} <= _vary(again)
+    assert again.content == b""
+
+    as_json = await client.get("/tasks", params=params, headers={"Accept-Encoding": "br", "If-None-Match": etag})
+    assert as_json.status_code == 200
+    assert as_json.headers["ETag"] != etag
+
+
+def _middleware_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+    body = {"data": "y" * COMPRESS_MIN_SIZE}
+
+    @app.get("/plain")
+    async def plain():
+        return body
+
+    @app.get("/small")
+    async def small():
+        return {"data": "y"}
+
+    @app.get("/tagged")
+    async def tagged():
+        return JSONResponse(body, headers={"ETag": '"1"'})
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(b"z" * COMPRESS_MIN_SIZE), headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+@pytest.fixture
+async def bare_client():
+    transport = httpx.ASGITransport(app=_middleware_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_middleware_compresses_other_buffered_responses(bare_client):
+    response = await bare_client.get("/plain", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in _vary(response)
+    assert int(response.headers["Content-Length"]) < COMPRESS_MIN_SIZE
+    assert response.json()["data"] == "y" * COMPRESS_MIN_SIZE
+
+
+@pytest.mark.parametrize("path", ["/small", "/tagged"])
+async def test_middleware_skips_small_and_tagged_responses(bare_client, path):
+    response = await bare_client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.json()["data"].startswith("y")
+
+
+async def test_middleware_leaves_encoded_responses_alone(bare_client):
+    response = await bare_client.get("/encoded", headers={"Accept-Encoding": "br"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == b"z" * COMPRESS_MIN_SIZE
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert flight.stats()["coalesced"] == 4
+    assert await flight.do("key", load) == 2
+
+
+async def test_error_reaches_every_waiting_caller():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert [type(result) for result in results] == [ValueError] * 3
+    assert flight.stats()["inflight"] == 0
+
+
+async def test_one_caller_cancelling_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("key", load))
+    second = asyncio.ensure_future(flight.do("key", load))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+async def test_forgotten_call_is_not_joined():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def before_write():
+        await release.wait()
+        return "old"
+
+    async def after_write():
+        return "new"
+
+    early = asyncio.ensure_future(flight.do("key", before_write))
+    await asyncio.sleep(0)
+    flight.forget(lambda key: key == "key")
+
+    assert await flight.do("key", after_write) == "new"
+    release.set()
+    assert await early == "old"
@@ -1,8 +1,9 @@
 const API_URL = process.env.NEXT_PUBLIC_API_URL;
 
-export const fetchTasks = async () => {
+export const fetchTasks = async (cursor) => {
     try {
-        const res = await fetch(`${API_URL}/tasks`);
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+        const res = await fetch(`${API_URL}/tasks${query}`);
         if (!res.ok) throw new Error(`Fetch error: ${res.statusText}`);
         return await res.json();
     } catch (error) {
@@ -22,6 +23,18 @@ export const fetchTaskById = async (id) => {
     }
 };
 
+// One request (and one query) for several tasks; `missing` lists the ids that don't exist.
+export const fetchTasksByIds = async (ids) => {
+    try {
+        const res = await fetch(`${API_URL}/tasks?ids=${ids.join(",")}`);
+        if (!res.ok) throw new Error(`Fetch error: ${res.statusText}`);
+        return await res.json();
+    } catch (error) {
+        console.error("fetchTasksByIds error:", error);
+        throw error;
+    }
+};
+
 export const createTask = async (task) => {
   const res = await fetch(`${API_URL}/tasks`, {
     method: "POST",
@@ -101,3 +114,11 @@ export const deleteTask = async (id) => {
     return res.json();
 };
 
+
+export const subscribeToTaskEvents = (onEvent) => {
+    const source = new EventSource(`${API_URL}/tasks/events`);
+    for (const type of ["created", "updated", "deleted", "reset"]) {
+        source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)));
+    }
+    return () => source.close();
+};
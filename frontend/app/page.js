@@ -2,12 +2,13 @@
 
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
-import { fetchTasks, deleteTask } from "./api/tasks";
+import { fetchTasks, deleteTask, subscribeToTaskEvents } from "./api/tasks";
 import { FaPencilAlt, FaTrash } from "react-icons/fa";
 import Swal from 'sweetalert2';
 
 export default function Tasks() {
   const [tasks, setTasks] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const router = useRouter();
 
@@ -15,16 +16,42 @@ export default function Tasks() {
     setLoading(true);
     fetchTasks()
       .then((data) => {
-        setTasks(data);
+        setTasks(data.items);
+        setNextCursor(data.next_cursor);
         setLoading(false);
       })
       .catch(console.error);
   };
 
+  const loadMore = () => {
+    fetchTasks(nextCursor)
+      .then((data) => {
+        setTasks((prev) => [...prev, ...data.items]);
+        setNextCursor(data.next_cursor);
+      })
+      .catch(console.error);
+  };
+
   useEffect(() => {
     loadTasks();
   }, []);
 
+  useEffect(() => {
+    return subscribeToTaskEvents((type, task) => {
+      // The server couldn't resume the stream, so some events were missed.
+      if (type === "reset") {
+        loadTasks();
+        return;
+      }
+      setTasks((prev) => {
+        const rest = prev.filter((t) => t.id !== task.id);
+        if (type === "deleted") return rest;
+        if (type === "created") return [task, ...rest];
+        return prev.map((t) => (t.id === task.id ? task : t));
+      });
+    });
+  }, []);
+
   const handleEdit = (taskId) => {
     router.push(`/tasks/${taskId}`);
   };
@@ -43,7 +70,7 @@ export default function Tasks() {
 
       if (result.isConfirmed) {
         await deleteTask(taskId);
-        await loadTasks();
+        setTasks((prev) => prev.filter((t) => t.id !== taskId));
         
         Swal.fire(
           'Deleted!',
@@ -121,6 +148,17 @@ export default function Tasks() {
           </div>
         }
       </ul>
+
+      {nextCursor && (
+        <div className="text-center">
+          <button
+            onClick={loadMore}
+            className="bg-gray-200 text-gray-800 px-5 py-2 rounded shadow hover:bg-gray-300 transition cursor-pointer"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 }